@@ -0,0 +1,78 @@
+"""
+Per-request cost of the access-token dependency, with and without ClaimsCache.
+
+Runs Authentication.get_access_user for one reused token, the way a client
+sends it on every request until it expires. The user is served from a warm
+UserCache and the login session from a set, so that only token handling
+is measured: "no_cache" decodes and verifies the JWT on every call,
+"claims_cache" verifies it once.
+
+Usage (from src/, with the app environment loaded):
+    python ../benchmarks/auth_overhead.py --calls 20000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from auth.cache import ClaimsCache, UserCache  # noqa: E402
+from auth.sessions import SessionStore  # noqa: E402
+from auth.service import Authentication  # noqa: E402
+from users.models import UserAuth  # noqa: E402
+
+
+class LocalSessions(SessionStore):
+    def __init__(self) -> None:
+        self.sessions: set[str] = set()
+
+    async def create(self, email: str, ttl: timedelta) -> str:
+        self.sessions.add(email)
+        return email
+
+    async def active(self, session: str) -> bool:
+        return session in self.sessions
+
+
+async def measure(auth: Authentication, token: str, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        await auth.get_access_user(token=token, db=None)
+    return time.perf_counter() - started
+
+
+async def main(args: argparse.Namespace) -> None:
+    auth = Authentication()
+    auth.USER_CACHE = UserCache(size=16, local_ttl=3600, ttl=3600)
+    email = "bench@example.com"
+    await auth.USER_CACHE.set(UserAuth(id=1, email=email,
+                                       email_confirmed=True))
+    auth.SESSIONS = LocalSessions()
+    session = await auth.SESSIONS.create(email, timedelta(hours=1))
+    token = auth.create_access_token(email, time_to_live=timedelta(hours=1),
+                                     session=session)
+
+    results = []
+    for name, size in (("no_cache", 0), ("claims_cache", 4096)):
+        auth.CLAIMS_CACHE = ClaimsCache(size=size)
+        await measure(auth, token, 100)
+        best = min([await measure(auth, token, args.calls)
+                    for _ in range(args.repeat)])
+        results.append({"mode": name,
+                        "best_ms": round(best * 1e3, 2),
+                        "per_call_us": round(best / args.calls * 1e6, 2)})
+    print(json.dumps({"calls": args.calls,
+                      "repeat": args.repeat,
+                      "algorithm": auth.ACCESS_ALGORITHM,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,129 @@
+"""
+Throughput of concurrent "handlers" with a sync Session vs an AsyncSession.
+
+Every simulated request runs one slow contacts query and then answers a
+cheap "ping" request that only needs the event loop. With a sync Session the
+query blocks the loop, so pings queue behind queries; with an AsyncSession
+the loop keeps serving them.
+
+Usage:
+    python benchmarks/db_concurrency.py --rows 50000 --requests 200 \
+        --concurrency 1 10 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import (create_engine, text, Table, Column, Integer,
+                        String, MetaData, insert)
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import Session
+
+metadata = MetaData()
+contacts = Table("contacts", metadata,
+                 Column("id", Integer, primary_key=True),
+                 Column("full_name", String),
+                 Column("owner", Integer))
+
+SLOW_QUERY = text("SELECT count(*) FROM contacts "
+                  "WHERE owner = :owner AND full_name LIKE :pattern")
+
+
+def fill(path: str, rows: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(contacts), [
+            {"full_name": f"Name {i} Surname {i % 977}", "owner": i % 50}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+async def run_sync(path: str, requests: int, concurrency: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}",
+                           pool_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler(i: int) -> None:
+        async with semaphore:
+            with Session(engine) as db:
+                db.execute(SLOW_QUERY, {"owner": i % 50,
+                                        "pattern": "%7%"}).scalar()
+
+    result = await measure(handler, requests)
+    engine.dispose()
+    return result
+
+
+async def run_async(path: str, requests: int, concurrency: int) -> dict:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}",
+                                 pool_size=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def handler(i: int) -> None:
+        async with semaphore:
+            async with AsyncSession(engine) as db:
+                (await db.execute(SLOW_QUERY, {"owner": i % 50,
+                                               "pattern": "%7%"})).scalar()
+
+    result = await measure(handler, requests)
+    await engine.dispose()
+    return result
+
+
+async def measure(handler, requests: int) -> dict:
+    ping_latencies = []
+    done = asyncio.Event()
+
+    async def ping() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            ping_latencies.append(time.perf_counter() - started - 0.001)
+
+    pinger = asyncio.create_task(ping())
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await pinger
+
+    ping_latencies.sort()
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+        "loop_lag_p50_ms": round(statistics.median(ping_latencies) * 1e3, 2),
+        "loop_lag_max_ms": round(ping_latencies[-1] * 1e3, 2),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite")
+        fill(path, args.rows)
+        results = []
+        for concurrency in args.concurrency:
+            for name, runner in (("sync_session", run_sync),
+                                 ("async_session", run_async)):
+                results.append({
+                    "mode": name,
+                    "concurrency": concurrency,
+                    **await runner(path, args.requests, concurrency),
+                })
+    print(json.dumps({"rows": args.rows,
+                      "requests": args.requests,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[1, 10, 50])
+    asyncio.run(main(parser.parse_args()))
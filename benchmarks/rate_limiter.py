@@ -0,0 +1,149 @@
+"""
+Per-request cost of the rate limiter: hybrid token buckets vs fastapi_limiter.
+
+Calls the route dependency of GET /contacts/ directly, for --clients
+clients in turn and with a limit none of them reaches. "fastapi_limiter"
+runs its Lua script in Redis on every request, "hybrid" decides from the
+local bucket and sends the hits to Redis every --sync seconds. Redis is an
+in-process fakeredis unless --redis-url is given; --rtt-ms adds a network
+round trip to every Redis call so fakeredis can stand in for a remote
+server.
+
+Usage (from src/, with the app environment loaded):
+    python ../benchmarks/rate_limiter.py --calls 20000 --rtt-ms 0.3
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fastapi_limiter import FastAPILimiter  # noqa: E402
+from fastapi_limiter.depends import RateLimiter  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+
+from main import app  # noqa: E402
+from ratelimit.limiter import (HybridLimiter, rate_limit,  # noqa: E402
+                               route_limit)
+from settings import settings  # noqa: E402
+
+ROUTE = "/contacts/"
+
+
+class RoundTrips:
+    """Counts the Redis round trips of a client, optionally delaying them."""
+
+    def __init__(self, redis, rtt: float) -> None:
+        self.count = 0
+        self.rtt = rtt
+        execute_command = redis.execute_command
+        pipeline = redis.pipeline
+
+        async def counted(*args, **kwargs):
+            await self.trip()
+            return await execute_command(*args, **kwargs)
+
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            async def counted_execute(*args, **kwargs):
+                await self.trip()
+                return await execute(*args, **kwargs)
+            pipe.execute = counted_execute
+            return pipe
+
+        redis.execute_command = counted
+        redis.pipeline = counted_pipeline
+
+    async def trip(self) -> None:
+        self.count += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+
+def make_requests(clients: int) -> list[Request]:
+    route = next(r for r in app.routes
+                 if r.path == ROUTE and "GET" in r.methods)
+    return [Request({"type": "http", "method": "GET", "path": ROUTE,
+                     "query_string": b"", "app": app, "route": route,
+                     "client": ("127.0.0.1", 1000),
+                     "headers": [(b"x-forwarded-for",
+                                  f"10.0.{n // 256}.{n % 256}".encode())]})
+            for n in range(clients)]
+
+
+async def measure(check: Callable[[Request], Awaitable], calls: int,
+                  requests: list[Request]) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for n in range(calls):
+        call_started = time.perf_counter()
+        await check(requests[n % len(requests)])
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {"calls_per_second": round(calls / elapsed),
+            "mean_us": round(statistics.fmean(latencies) * 1e6, 2),
+            "p50_us": round(quantiles[49] * 1e6, 2),
+            "p99_us": round(quantiles[98] * 1e6, 2)}
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.redis_url:
+        from redis.asyncio import Redis
+        redis = Redis.from_url(args.redis_url)
+    else:
+        from fakeredis import FakeAsyncRedis
+        redis = FakeAsyncRedis()
+    trips = RoundTrips(redis, args.rtt_ms / 1000)
+    requests = make_requests(args.clients)
+    results = {}
+
+    await FastAPILimiter.init(redis, prefix="bench-limiter")
+    dependency = RateLimiter(times=10 ** 9, seconds=60)
+    response = Response()
+    trips.count = 0
+    results["fastapi_limiter"] = await measure(
+        lambda request: dependency(request, response), args.calls, requests)
+    results["fastapi_limiter"]["redis_round_trips"] = trips.count
+
+    limiter = HybridLimiter(sync_interval=args.sync, fail="open",
+                            size=args.clients)
+    HybridLimiter.init(redis)
+    route_limit.cache_clear()
+    trips.count = 0
+    with patch.object(settings, "rate_limit", f"{10 ** 9}/m"), \
+            patch("ratelimit.limiter.limiter", limiter):
+        results["hybrid"] = await measure(rate_limit, args.calls, requests)
+        await limiter.close()
+    results["hybrid"]["redis_round_trips"] = trips.count
+
+    if args.redis_url:
+        await redis.aclose()
+    print(json.dumps({"calls": args.calls,
+                      "clients": args.clients,
+                      "redis": "url" if args.redis_url else "fakeredis",
+                      "rtt_ms": args.rtt_ms,
+                      "sync_seconds": args.sync,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--sync", type=float, default=0.5,
+                        help="seconds between hybrid limiter syncs")
+    parser.add_argument("--rtt-ms", type=float, default=0.0,
+                        help="delay added to every Redis round trip")
+    parser.add_argument("--redis-url",
+                        help="measure against a real Redis instead")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,103 @@
+"""
+Per-row cost of encoding a list of contacts as the JSON response body.
+
+Compares the previous path (ContactResponse.from_orm per ORM object, then
+FastAPI's response_model validation and stdlib json), a pydantic TypeAdapter
+dumping plain dicts, and the ContactsJSONResponse (orjson over row tuples)
+used by the list routes. All three must produce the same JSON document.
+
+Usage (from src/, with the app environment loaded):
+    python ../benchmarks/serialization.py --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import Any, List, Optional
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from contacts.models import ContactResponse  # noqa: E402
+from contacts.orms import ContactORM  # noqa: E402
+from contacts.responses import (ContactsJSONResponse,  # noqa: E402
+                                RESPONSE_FIELDS, contact_dicts)
+
+
+class ContactRow(TypedDict):
+    first_name: str
+    last_name: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    birthday: Optional[date]
+    extra: Any
+    id: int
+    full_name: str
+
+
+def make_rows(count: int) -> list[tuple]:
+    return [(f"Name{i}", f"Surname{i % 977}" if i % 3 else None,
+             f"user{i}@example.com", f"38050{i:07d}",
+             date(1970 + i % 50, i % 12 + 1, i % 28 + 1),
+             "note" if i % 5 == 0 else None,
+             i + 1, f"Name{i} Surname{i % 977}" if i % 3 else f"Name{i}")
+            for i in range(count)]
+
+
+def orm_objects(rows: list[tuple]) -> list[ContactORM]:
+    return [ContactORM(**dict(zip(RESPONSE_FIELDS, row))) for row in rows]
+
+
+def main(args: argparse.Namespace) -> None:
+    rows = make_rows(args.rows)
+    objects = orm_objects(rows)
+    field = create_response_field(name="response",
+                                  type_=List[ContactResponse])
+    adapter = TypeAdapter(List[ContactRow])
+
+    def from_orm() -> bytes:
+        content = [ContactResponse.from_orm(_) for _ in objects]
+        content = asyncio.run(serialize_response(field=field,
+                                                 response_content=content))
+        return JSONResponse(content).body
+
+    def type_adapter() -> bytes:
+        return adapter.dump_json(contact_dicts(rows))
+
+    def rows_orjson() -> bytes:
+        return ContactsJSONResponse(rows).body
+
+    reference = json.loads(from_orm())
+    results = []
+    for name, encode in (("from_orm_response_model", from_orm),
+                         ("type_adapter_dump_json", type_adapter),
+                         ("orjson_rows", rows_orjson)):
+        assert json.loads(encode()) == reference, name
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            encode()
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results.append({"mode": name,
+                        "best_ms": round(best * 1e3, 2),
+                        "per_row_us": round(best / args.rows * 1e6, 3)})
+    print(json.dumps({"rows": args.rows,
+                      "repeat": args.repeat,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+"""
+Encode and decode throughput of the token codecs per backend and algorithm.
+
+Every available backend signs and verifies the same claims with HS256,
+HS512, ES256 and EdDSA; combinations a backend does not support, or whose
+package is not installed, are reported as skipped. Keys for the asymmetric
+algorithms are generated into a temporary directory for the run.
+
+Usage (from src/, with the app environment loaded):
+    python ../benchmarks/token_codecs.py --calls 20000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from auth.tokens import make_codec, TokenCodec  # noqa: E402
+
+BACKENDS = ("hmac", "jose", "pyjwt")
+ALGORITHMS = ("HS256", "HS512", "ES256", "EdDSA")
+CLAIMS = {"sub": "bench@example.com",
+          "exp": 2_000_000_000,
+          "scope": "access_token"}
+
+
+def write_keys(directory: Path, algorithm: str) -> Optional[Path]:
+    """Generate a PEM private key for algorithm, None if not possible."""
+    pem = None
+    try:
+        if algorithm == "ES256":
+            from ecdsa import NIST256p, SigningKey
+            pem = SigningKey.generate(curve=NIST256p).to_pem()
+        elif algorithm == "EdDSA":
+            from cryptography.hazmat.primitives import serialization
+            from cryptography.hazmat.primitives.asymmetric import ed25519
+            pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption())
+    except ImportError:
+        return None
+    if pem is None:
+        return None
+    path = directory / f"{algorithm}.pem"
+    path.write_bytes(pem)
+    return path
+
+
+def best_of(func: Callable[[], object], calls: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(codec: TokenCodec, calls: int, repeat: int) -> dict:
+    token = codec.encode(CLAIMS)
+    assert codec.decode(token) == CLAIMS
+    encode = best_of(lambda: codec.encode(CLAIMS), calls, repeat)
+    decode = best_of(lambda: codec.decode(token), calls, repeat)
+    return {"encode_us": round(encode / calls * 1e6, 2),
+            "decode_us": round(decode / calls * 1e6, 2),
+            "token_bytes": len(token)}
+
+
+def main(args: argparse.Namespace) -> None:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for algorithm in args.algorithms:
+            private_key = None
+            if not algorithm.startswith("HS"):
+                private_key = write_keys(Path(directory), algorithm)
+            for backend in args.backends:
+                row = {"backend": backend, "algorithm": algorithm}
+                try:
+                    if private_key is None \
+                            and not algorithm.startswith("HS"):
+                        raise RuntimeError("no key generator installed")
+                    codec = make_codec(algorithm, secret="bench-secret",
+                                       private_key=private_key,
+                                       backend=backend)
+                    row.update(measure(codec, args.calls, args.repeat))
+                except Exception as e:
+                    row["skipped"] = f"{type(e).__name__}: {e}"
+                results.append(row)
+    print(json.dumps({"calls": args.calls,
+                      "repeat": args.repeat,
+                      "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS,
+                        default=BACKENDS)
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS,
+                        default=ALGORITHMS)
+    main(parser.parse_args())
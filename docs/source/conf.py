@@ -21,7 +21,7 @@ extensions = ['sphinx.ext.autodoc', 'sphinx.ext.napoleon']
 
 templates_path = ['_templates']
 exclude_patterns = ['db.py', 'settings.py', 'migrations', 'alembic*',
-                    'faker_db_filler.py', '*sqlite', '*.env']
+                    'db_filler.py', '*sqlite', '*.env']
 
 
 
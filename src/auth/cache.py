@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from users.models import UserAuth
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Two-level TTL cache of authenticated users keyed by token subject.
+
+    The in-process LRU answers repeated requests on the same worker, Redis
+    shares entries between workers. Local entries live only a few seconds
+    because invalidations from other workers reach them through Redis.
+    Redis failures are logged and treated as misses.
+    """
+    redis: Optional[Redis] = None
+    prefix = "user:"
+
+    def __init__(self,
+                 size: int,
+                 local_ttl: float,
+                 ttl: int) -> None:
+        self.size = size
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self.local: OrderedDict[str, tuple[float, UserAuth]] = OrderedDict()
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def init(cls, redis: Redis) -> None:
+        cls.redis = redis
+
+    async def get(self, email: str) -> Optional[UserAuth]:
+        entry = self.local.get(email)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self.local.move_to_end(email)
+                self.hits += 1
+                return user
+            del self.local[email]
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self.prefix + email)
+            except RedisError as e:
+                logger.warning(f"user cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                user = UserAuth.model_validate_json(raw)
+                self._store_local(email, user)
+                self.redis_hits += 1
+                return user
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: UserAuth) -> None:
+        self._store_local(user.email, user)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self.prefix + user.email,
+                                     user.model_dump_json(),
+                                     ex=self.ttl)
+            except RedisError as e:
+                logger.warning(f"user cache write failed: {e}")
+
+    async def invalidate(self, email: str) -> None:
+        self.local.pop(email, None)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(self.prefix + email)
+            except RedisError as e:
+                logger.warning(f"user cache invalidation failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "size": len(self.local)}
+
+    def _store_local(self, email: str, user: UserAuth) -> None:
+        self.local[email] = (time.monotonic() + self.local_ttl, user)
+        self.local.move_to_end(email)
+        while len(self.local) > self.size:
+            self.local.popitem(last=False)
+
+
+user_cache = UserCache(size=settings.user_cache_size,
+                       local_ttl=settings.user_cache_local_ttl,
+                       ttl=settings.user_cache_ttl)
+
+
+class ClaimsCache:
+    """
+    In-process LRU of verified JWT claims keyed by a digest of the token.
+
+    A client reuses its access token until it expires, so the signature of
+    a token seen before needs no second verification. Entries expire at the
+    token's exp claim; afterwards the token is decoded again and rejected
+    by the usual expiry checks. A size of 0 disables the cache.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.local: OrderedDict[bytes, tuple[float, dict[str, Any]]] = \
+            OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(token: str, scope: str) -> bytes:
+        return hashlib.blake2b(f"{scope}:{token}".encode(),
+                               digest_size=16).digest()
+
+    def get(self, token: str, scope: str) -> Optional[dict[str, Any]]:
+        key = self.key(token, scope)
+        entry = self.local.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self.local.move_to_end(key)
+                self.hits += 1
+                return claims
+            del self.local[key]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, scope: str, claims: dict[str, Any]) -> None:
+        """Remember claims verified for token until their exp."""
+        try:
+            expires_at = float(claims["exp"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if self.size <= 0 or expires_at <= time.time():
+            return
+        key = self.key(token, scope)
+        self.local[key] = (expires_at, claims)
+        self.local.move_to_end(key)
+        while len(self.local) > self.size:
+            self.local.popitem(last=False)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.local)}
+
+
+claims_cache = ClaimsCache(size=settings.token_cache_size)
@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import (Executor,
+                                ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from typing import Any, Callable, Literal
+
+import bcrypt
+from fastapi import HTTPException
+from starlette import status
+
+from settings import settings
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password=plain_password.encode(),
+                          hashed_password=hashed_password.encode())
+
+
+def make_password_hash(plain_password: str) -> str:
+    return bcrypt.hashpw(password=plain_password.encode(),
+                         salt=bcrypt.gensalt()).decode()
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated executor so it never blocks the event loop.
+
+    At most `workers + queue_size` calls are admitted at once, the rest
+    are rejected right away with 503 instead of piling up behind a login
+    storm.
+    """
+
+    def __init__(self,
+                 kind: Literal["thread", "process"],
+                 workers: int,
+                 queue_size: int) -> None:
+        self.kind = kind
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.capacity:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests. Try again later.",
+                headers={"Retry-After": "1"}
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(check_password, plain_password, hashed_password)
+
+    async def hash(self, plain_password: str) -> str:
+        return await self.run(make_password_hash, plain_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(kind=settings.password_executor,
+                                 workers=settings.password_workers,
+                                 queue_size=settings.password_queue_size)
@@ -1,15 +1,17 @@
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, BackgroundTasks
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 from starlette import status
 from starlette.requests import Request
 
-from users.models import UserDB, UserRequest, TokenResponse
+from users.models import UserDB, UserRequest, UserAuth, TokenResponse
 from users.orms import User
 from auth.service import Authentication
+from ratelimit.limiter import rate_limit
 from db import get_db
 from email_service.routes import send_confirmation, EmailModel
 
@@ -23,13 +25,13 @@ auth_service = Authentication()
              response_model=UserDB,
              responses={409: {"description": "User already exists"},
                         201: {"model": UserDB}},
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             dependencies=[Depends(rate_limit)])
 async def new_user(
         user: UserRequest,
-        db: Annotated[Session, Depends(get_db)],
+        db: Annotated[AsyncSession, Depends(get_db)],
         bg_task: BackgroundTasks
 ) -> Any:
-    exists = db.query(User).filter(User.email == user.email).first()
+    exists = await db.scalar(select(User).filter(User.email == user.email))
     if exists:
         return JSONResponse(
             status_code=status.HTTP_409_CONFLICT,
@@ -41,18 +43,18 @@ async def new_user(
                 ]}
         )
 
-    hashed_pwd = auth_service.hash_password(user.password)
+    hashed_pwd = await auth_service.hash_password_async(user.password)
     user = User(email=user.email,
                 hashed_pwd=hashed_pwd)
     db.add(user)
-    db.commit()
+    await db.commit()
 
     email_param = EmailModel(email=user.email)
     res = await send_confirmation(email=email_param,
                                   bg_task=bg_task,
                                   db=db)
 
-    ret_user = db.query(User).filter(User.email == user.email).first()
+    ret_user = await db.scalar(select(User).filter(User.email == user.email))
 
     return JSONResponse(
         status_code=201,
@@ -63,12 +65,14 @@ async def new_user(
 
 @router.post("/login",
              response_model=TokenResponse,
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             dependencies=[Depends(rate_limit)])
 async def login(
         user: UserRequest,
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Any:
-    user_db: User = db.query(User).filter(User.email == user.email).first()
+    user_db: User = await db.scalar(
+        select(User).filter(User.email == user.email)
+    )
     if not user_db:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,7 +82,8 @@ async def login(
                 ]}
         )
 
-    if not auth_service.verify_password(user.password, user_db.hashed_pwd):
+    if not await auth_service.verify_password_async(user.password,
+                                                    user_db.hashed_pwd):
         return JSONResponse(
             status_code=status.HTTP_401_UNAUTHORIZED,
             content={
@@ -97,10 +102,8 @@ async def login(
             }
         )
 
-    access_token = auth_service.create_access_token(user.email)
-    refresh_token = auth_service.create_refresh_token(user.email)
-    user_db.loggedin = True
-    db.commit()
+    access_token, refresh_token = \
+        await auth_service.login_tokens(user_db.email)
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={"access_token": access_token,
@@ -111,23 +114,20 @@ async def login(
 
 @router.post("/refresh",
              response_model=TokenResponse,
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             dependencies=[Depends(rate_limit)])
 async def refresh(
         request: Request,
-        user: Annotated[User, Depends(auth_service.get_refresh_user)]
+        user: Annotated[UserAuth, Depends(auth_service.get_refresh_user)]
 ) -> Any:
-    if not user.loggedin:
-        return JSONResponse(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            content={"details": "User not logged in. Use /auth/login"}
-        )
     if user.email is None:
         return JSONResponse(
             status_code=status.HTTP_403_FORBIDDEN,
             content={"details": "Invalid credentials"}
         )
-    access_token = auth_service.create_access_token(user.email)
     refresh_token = request.headers.get("Authorization").split(" ")[1]
+    session = auth_service.decode_token(refresh_token, "refresh_token")["sid"]
+    access_token = auth_service.create_access_token(user.email,
+                                                    session=session)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -138,14 +138,38 @@ async def refresh(
 
 
 @router.post("/logout",
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             dependencies=[Depends(rate_limit)])
 async def logout(
-        user: Annotated[User, Depends(auth_service.get_access_user)],
-        db: Annotated[Session, Depends(get_db)]
+        user: Annotated[UserAuth, Depends(auth_service.get_access_user)],
+        token: Annotated[str, Depends(auth_service.oauth2_schema)]
 ) -> Any:
-    user.loggedin = False
-    db.commit()
+    session = auth_service.decode_token(token)["sid"]
+    try:
+        await auth_service.SESSIONS.revoke(session, user.email)
+    except RedisError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"details": [{"msg": f"Session store unavailable: {e}"}]}
+        )
     return JSONResponse(
         status_code=status.HTTP_200_OK,
         content={"details": "User logged out"}
     )
+
+
+@router.post("/logout/all",
+             dependencies=[Depends(rate_limit)])
+async def logout_all(
+        user: Annotated[UserAuth, Depends(auth_service.get_access_user)]
+) -> Any:
+    try:
+        ended = await auth_service.SESSIONS.revoke_all(user.email)
+    except RedisError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"details": [{"msg": f"Session store unavailable: {e}"}]}
+        )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"details": f"User logged out of {ended} sessions"}
+    )
@@ -1,26 +1,40 @@
 from datetime import datetime, timezone, timedelta
-from typing import Any, TypeAlias, Literal, Annotated
+from typing import Any, Optional, TypeAlias, Literal, Annotated
 
 
-from jose import jwt, JWTError
 import bcrypt
 from fastapi import security, Depends, HTTPException
-from sqlalchemy.orm import Session
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from users.orms import User
+from users.models import UserAuth
+from auth.hashing import password_hasher
+from auth.cache import claims_cache, user_cache
+from auth.sessions import sessions
+from auth.tokens import access_codec, refresh_codec, InvalidToken
 from db import get_db
 from settings import settings
 
 Scope: TypeAlias = Literal['access_token', 'refresh_token']
 
+REFRESH_TOKEN_TTL = timedelta(days=7)
+
 
 class Authentication:
     HASH_SERVICE = bcrypt
+    PASSWORD_HASHER = password_hasher
+    USER_CACHE = user_cache
+    CLAIMS_CACHE = claims_cache
+    SESSIONS = sessions
     ACCESS_ALGORITHM = settings.access_algorithm
     REFRESH_ALGORITHM = settings.refresh_algorithm
     SECRET_256 = settings.secret_256
     SECRET_512 = settings.secret_512
+    ACCESS_CODEC = access_codec
+    REFRESH_CODEC = refresh_codec
     oauth2_schema = security.OAuth2PasswordBearer(tokenUrl="/auth/login")
 
     def verify_password(
@@ -42,82 +56,144 @@ class Authentication:
             salt=self.HASH_SERVICE.gensalt()
         ).decode()
 
+    async def verify_password_async(
+            self,
+            plain_password: str,
+            hashed_password: str
+    ) -> bool:
+        return await self.PASSWORD_HASHER.verify(plain_password,
+                                                 hashed_password)
+
+    async def hash_password_async(
+            self,
+            plain_password: str
+    ) -> str:
+        return await self.PASSWORD_HASHER.hash(plain_password)
+
     def create_token(
             self,
             email: str,
             scope: Scope,
-            time_to_live: timedelta
+            time_to_live: timedelta,
+            session: Optional[str] = None
     ) -> str:
         current_time = datetime.now(timezone.utc)
         expiration_time = current_time + time_to_live
 
-        key = self.SECRET_256\
+        codec = self.ACCESS_CODEC \
             if scope == "access_token" \
-            else self.SECRET_512
-
-        algorithm = self.ACCESS_ALGORITHM \
-            if scope == "access_token" \
-            else self.REFRESH_ALGORITHM
+            else self.REFRESH_CODEC
 
         payload = {
             "sub": email,
-            "exp": expiration_time,
+            "exp": int(expiration_time.timestamp()),
             "scope": scope
         }
+        if session is not None:
+            # a session is identified by the jti of its refresh token
+            payload["sid"] = session
+            if scope == "refresh_token":
+                payload["jti"] = session
 
-        jwt_token = jwt.encode(claims=payload,
-                               key=key,
-                               algorithm=algorithm)
-
-        return jwt_token
+        return codec.encode(payload)
 
     def create_access_token(
             self,
             email: str,
-            time_to_live: timedelta = timedelta(minutes=15)
+            time_to_live: timedelta = timedelta(minutes=15),
             # time_to_live: timedelta = timedelta(days=1)
+            session: Optional[str] = None
     ) -> str:
-        return self.create_token(self,
-                                 email=email,
+        return self.create_token(email=email,
                                  time_to_live=time_to_live,
-                                 scope="access_token")
+                                 scope="access_token",
+                                 session=session)
 
     def create_refresh_token(
             self,
             email: str,
-            time_to_live: timedelta = timedelta(days=7)
+            time_to_live: timedelta = REFRESH_TOKEN_TTL,
+            session: Optional[str] = None
     ) -> str:
-        return self.create_token(self,
-                                 email=email,
+        return self.create_token(email=email,
                                  scope="refresh_token",
-                                 time_to_live=time_to_live)
+                                 time_to_live=time_to_live,
+                                 session=session)
 
-    def get_user(
+    async def login_tokens(self, email: str) -> tuple[str, str]:
+        """
+        Start a session of email and mint its tokens.
+
+        Args:
+            email (str): the authenticated user's email
+
+        Returns:
+            the access and the refresh token of the new session
+        """
+        try:
+            session = await self.SESSIONS.create(email, REFRESH_TOKEN_TTL)
+        except RedisError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Session store unavailable: {e}"
+            )
+        return (self.create_access_token(email, session=session),
+                self.create_refresh_token(email, session=session))
+
+    def decode_token(
             self,
-            token: Annotated[str, Depends(oauth2_schema)],
-            db: Annotated[Session, Depends(get_db)],
+            token: str,
             scope: Scope = "access_token"
-    ) -> Any:
-
-        key = self.SECRET_256 \
+    ) -> dict[str, Any]:
+        codec = self.ACCESS_CODEC \
             if scope == "access_token" \
-            else self.SECRET_512
+            else self.REFRESH_CODEC
 
-        algorithm = self.ACCESS_ALGORITHM \
-            if scope == "access_token" \
-            else self.REFRESH_ALGORITHM
+        payload = self.CLAIMS_CACHE.get(token, scope)
+        if payload is None:
+            try:
+                payload = codec.decode(token)
+            except InvalidToken as e:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail=f"Invalid token: {e}"
+                )
+            self.CLAIMS_CACHE.set(token, scope, payload)
+        return payload
 
+    async def session_active(self, session: Optional[str]) -> bool:
+        if session is None:
+            return False
         try:
-            payload = jwt.decode(token=token,
-                                 key=key,
-                                 algorithms=[algorithm],
-                                 options={"verify_exp": False})
-        except JWTError as e:
+            return await self.SESSIONS.active(session)
+        except RedisError as e:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Invalid token: {e}"
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Session store unavailable: {e}"
             )
 
+    async def get_user(
+            self,
+            token: Annotated[str, Depends(oauth2_schema)],
+            db: Annotated[AsyncSession, Depends(get_db)],
+            scope: Scope = "access_token",
+            check_session: bool = True
+    ) -> Any:
+        """
+        Resolve the user of token.
+
+        Args:
+            token (str): access or refresh token
+            db (AsyncSession): used when the user is not cached
+            scope (str): the scope token was issued for
+            check_session (bool): require the token's login session to be
+                active, off for the session-less email confirmation tokens
+
+        Returns:
+            the UserAuth of the token's subject
+        """
+        payload = self.decode_token(token, scope)
+
         if payload.get("scope") not in ["access_token", "refresh_token"]:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -138,6 +214,21 @@ class Authentication:
                 detail="Token expired. Use /auth/refresh with refresh token"
             )
 
+        if all([payload.get("scope") == "refresh_token",
+                int(payload.get("exp"))
+                <= int(datetime.timestamp(datetime.now(timezone.utc)))]):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token expired. Use /auth/login to get new tokens"
+            )
+
+        if check_session and not await self.session_active(
+                payload.get("sid")):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Session ended. Use /auth/login"
+            )
+
         email = payload.get("sub")
         if email is None:
             raise HTTPException(
@@ -145,50 +236,39 @@ class Authentication:
                 detail="Invalid token scope"
             )
 
-        user = db.query(User).filter(
-            User.email == email
-        ).first()
-
+        user = await self.USER_CACHE.get(email)
         if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found."
-            )
+            user_db = await db.scalar(select(User).filter(
+                User.email == email
+            ))
 
-        if all([payload.get("scope") == "refresh_token",
-                int(payload.get("exp"))
-                <= int(datetime.timestamp(datetime.now(timezone.utc)))]):
-            user.loggedin = False
-            db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token expired. Use /auth/login to get new tokens"
-            )
+            if user_db is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found."
+                )
 
-        if User.loggedin:
-            return user
+            user = UserAuth.model_validate(user_db)
+            await self.USER_CACHE.set(user)
 
-        return HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not logged in. Use /auth/login"
-        )
+        return user
 
-    def get_access_user(
+    async def get_access_user(
             self,
             token: Annotated[str, Depends(oauth2_schema)],
-            db: Annotated[Session, Depends(get_db)]
+            db: Annotated[AsyncSession, Depends(get_db)]
     ) -> Any:
-        return self.get_user(
+        return await self.get_user(
             token=token,
             db=db
         )
 
-    def get_refresh_user(
+    async def get_refresh_user(
             self,
             token: Annotated[str, Depends(oauth2_schema)],
-            db: Annotated[Session, Depends(get_db)]
+            db: Annotated[AsyncSession, Depends(get_db)]
     ) -> Any:
-        return self.get_user(
+        return await self.get_user(
             token=token,
             db=db,
             scope="refresh_token"
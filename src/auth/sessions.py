@@ -0,0 +1,81 @@
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from redis_pool import delete_many, pipelined
+
+
+class SessionStore:
+    """
+    Login sessions in Redis, one key per session.
+
+    A login creates a session whose id is the jti of its refresh token and
+    which expires together with it; the access tokens minted for it carry
+    the id in their sid claim. A token is accepted while its session key
+    exists, so logging out one device or all of a user's devices deletes
+    keys instead of writing the users table. Unlike the caches, the store
+    is authoritative: without Redis no session can be verified and the
+    methods raise RedisError.
+    """
+    redis: Optional[Redis] = None
+    prefix = "session:"
+    user_prefix = "sessions:"
+
+    @classmethod
+    def init(cls, redis: Redis) -> None:
+        cls.redis = redis
+
+    def _redis(self) -> Redis:
+        if self.redis is None:
+            raise RedisError("the session store is not initialised")
+        return self.redis
+
+    async def create(self, email: str, ttl: timedelta) -> str:
+        """
+        Start a session of email.
+
+        Args:
+            email (str): the user's email, the tokens' subject
+            ttl (timedelta): lifetime of the session's refresh token
+
+        Returns:
+            the session id
+        """
+        session = uuid.uuid4().hex
+        # every session lives for the same ttl, so the index of the user's
+        # sessions expires with the newest one
+        await pipelined(self._redis(), (
+            ("set", (self.prefix + session, email), {"ex": ttl}),
+            ("sadd", (self.user_prefix + email, session), {}),
+            ("expire", (self.user_prefix + email, ttl), {})))
+        return session
+
+    async def active(self, session: str) -> bool:
+        return bool(await self._redis().exists(self.prefix + session))
+
+    async def revoke(self, session: str, email: str) -> None:
+        await pipelined(self._redis(), (
+            ("delete", (self.prefix + session,), {}),
+            ("srem", (self.user_prefix + email, session), {})))
+
+    async def revoke_all(self, email: str) -> int:
+        """
+        End every session of email.
+
+        Returns:
+            the number of sessions that were still active
+        """
+        redis = self._redis()
+        index = self.user_prefix + email
+        keys = [self.prefix + session.decode()
+                for session in await redis.smembers(index)]
+        if not keys:
+            return 0
+        # a set exists while it has members, so the index is one of them
+        return await delete_many(redis, keys + [index]) - 1
+
+
+sessions = SessionStore()
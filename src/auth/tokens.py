@@ -0,0 +1,239 @@
+import base64
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+
+from settings import settings
+
+HMAC_DIGESTS = {"HS256": hashlib.sha256,
+                "HS384": hashlib.sha384,
+                "HS512": hashlib.sha512}
+
+
+class InvalidToken(Exception):
+    """The token is malformed or its signature does not verify."""
+
+
+def b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+class TokenCodec(ABC):
+    """
+    Signs claims into a JWT and verifies them back for one algorithm.
+
+    Keys are parsed once, when the codec is created. decode checks the
+    signature only; expiry and scope stay with the caller. A codec built
+    without a signing key can only verify, which is how other services
+    check asymmetrically signed tokens without the private key.
+    """
+    backend = ""
+
+    def __init__(self, algorithm: str) -> None:
+        self.algorithm = algorithm
+
+    @abstractmethod
+    def encode(self, claims: dict[str, Any]) -> str:
+        """Sign claims into a compact JWT."""
+
+    @abstractmethod
+    def decode(self, token: str) -> dict[str, Any]:
+        """Claims of token, InvalidToken if it does not verify."""
+
+
+class HMACCodec(TokenCodec):
+    """
+    HS256/HS384/HS512 on the standard library and orjson.
+
+    The keyed HMAC state and the encoded header are prepared once, each
+    token only copies the state, so no key is processed per call.
+    """
+    backend = "hmac"
+
+    def __init__(self, algorithm: str, secret: str) -> None:
+        super().__init__(algorithm)
+        if algorithm not in HMAC_DIGESTS:
+            raise ValueError(f"hmac backend does not support {algorithm}")
+        self._mac = hmac.new(secret.encode(),
+                             digestmod=HMAC_DIGESTS[algorithm])
+        self._header = b64encode(orjson.dumps({"alg": algorithm,
+                                               "typ": "JWT"}))
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        signing_input = self._header + b"." + b64encode(orjson.dumps(claims))
+        return (signing_input + b"."
+                + b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            signing_input, _, signature = token.encode().rpartition(b".")
+            header, _, payload = signing_input.partition(b".")
+            if header != self._header \
+                    and orjson.loads(b64decode(header)).get("alg") \
+                    != self.algorithm:
+                raise InvalidToken("The specified alg value is not allowed")
+            if not hmac.compare_digest(b64decode(signature),
+                                       self._sign(signing_input)):
+                raise InvalidToken("Signature verification failed.")
+            claims = orjson.loads(b64decode(payload))
+        except (ValueError, AttributeError) as e:
+            raise InvalidToken(f"Error decoding token: {e}") from e
+        if not isinstance(claims, dict):
+            raise InvalidToken("Invalid payload: must be a json object")
+        return claims
+
+
+class JoseCodec(TokenCodec):
+    """python-jose with keys constructed once: HS*, RS*, ES*."""
+    backend = "jose"
+
+    def __init__(self,
+                 algorithm: str,
+                 signing_key: Optional[str],
+                 verify_key: Optional[str]) -> None:
+        from jose import jwk, jwt, JWTError
+
+        super().__init__(algorithm)
+        self._jwt = jwt
+        self._error = JWTError
+        self._signing_key = jwk.construct(signing_key, algorithm) \
+            if signing_key else None
+        if verify_key:
+            self._verify_key = jwk.construct(verify_key, algorithm)
+        elif algorithm.startswith("HS"):
+            self._verify_key = self._signing_key
+        else:
+            self._verify_key = self._signing_key.public_key()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        if self._signing_key is None:
+            raise InvalidToken("no signing key, this codec only verifies")
+        return self._jwt.encode(claims, self._signing_key,
+                                algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self._verify_key,
+                                    algorithms=[self.algorithm],
+                                    options={"verify_exp": False})
+        except self._error as e:
+            raise InvalidToken(str(e)) from e
+
+
+class PyJWTCodec(TokenCodec):
+    """PyJWT with keys prepared once: HS*, ES256, EdDSA (PyJWT[crypto])."""
+    backend = "pyjwt"
+
+    def __init__(self,
+                 algorithm: str,
+                 signing_key: Optional[str],
+                 verify_key: Optional[str]) -> None:
+        try:
+            import jwt
+            from jwt.algorithms import get_default_algorithms
+        except ImportError as e:
+            raise RuntimeError("the pyjwt token backend needs "
+                               "the PyJWT[crypto] package, installed by "
+                               "the eddsa extra") from e
+
+        super().__init__(algorithm)
+        self._jwt = jwt
+        prepare = get_default_algorithms()[algorithm].prepare_key
+        self._signing_key = prepare(signing_key) if signing_key else None
+        if verify_key:
+            self._verify_key = prepare(verify_key)
+        elif algorithm.startswith("HS"):
+            self._verify_key = self._signing_key
+        else:
+            self._verify_key = self._signing_key.public_key()
+
+    def encode(self, claims: dict[str, Any]) -> str:
+        if self._signing_key is None:
+            raise InvalidToken("no signing key, this codec only verifies")
+        return self._jwt.encode(claims, self._signing_key,
+                                algorithm=self.algorithm)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(token, self._verify_key,
+                                    algorithms=[self.algorithm],
+                                    options={"verify_exp": False})
+        except self._jwt.PyJWTError as e:
+            raise InvalidToken(str(e)) from e
+
+
+def pyjwt_installed() -> bool:
+    try:
+        import jwt  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def make_codec(algorithm: str,
+               secret: Optional[str] = None,
+               private_key: Optional[Path] = None,
+               public_key: Optional[Path] = None,
+               backend: str = "auto") -> TokenCodec:
+    """
+    Build the codec for algorithm, reading key files once.
+
+    Args:
+        algorithm (str): JWT alg, HS* take secret, the others take PEM
+            files, public_key alone gives a verify-only codec
+        secret (str): shared secret of the HS* algorithms
+        private_key (Path): PEM file with the signing key
+        public_key (Path): PEM file with the verification key
+        backend (str): "hmac", "jose", "pyjwt" or "auto", which is hmac
+            for HS*, PyJWT for EdDSA, which python-jose lacks, and for
+            the others PyJWT when installed, else python-jose
+
+    Returns:
+        the TokenCodec
+    """
+    symmetric = algorithm.startswith("HS")
+    if backend == "auto":
+        backend = "hmac" if symmetric \
+            else "pyjwt" if algorithm == "EdDSA" or pyjwt_installed() \
+            else "jose"
+    if symmetric:
+        if not secret:
+            raise ValueError(f"{algorithm} needs a secret")
+        if backend == "hmac":
+            return HMACCodec(algorithm, secret)
+        signing_key = verify_key = secret
+    else:
+        if private_key is None and public_key is None:
+            raise ValueError(f"{algorithm} needs a private or public key")
+        signing_key = private_key.read_text() if private_key else None
+        verify_key = public_key.read_text() if public_key else None
+    if backend == "jose":
+        return JoseCodec(algorithm, signing_key, verify_key)
+    if backend == "pyjwt":
+        return PyJWTCodec(algorithm, signing_key, verify_key)
+    raise ValueError(f"{backend} backend does not support {algorithm}")
+
+
+access_codec = make_codec(settings.access_algorithm,
+                          secret=settings.secret_256,
+                          private_key=settings.access_private_key,
+                          public_key=settings.access_public_key,
+                          backend=settings.token_backend)
+refresh_codec = make_codec(settings.refresh_algorithm,
+                           secret=settings.secret_512,
+                           private_key=settings.refresh_private_key,
+                           public_key=settings.refresh_public_key,
+                           backend=settings.token_backend)
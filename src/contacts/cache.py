@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import time
+import zlib
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.responses import Response
+
+from contacts.versions import (contact_versions, make_etag, not_modified,
+                               request_digest)
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ContactCache:
+    """
+    Read-through Redis cache of contact read responses.
+
+    Keys carry the owner's contacts version (see ContactVersions), so a
+    write makes all of the owner's entries unreachable at once and they
+    simply expire. Bodies are stored zlib-compressed. On a miss one
+    request per key renders the response under a short Redis lock while
+    the others poll for its result, falling back to rendering themselves
+    after settings.contacts_cache_wait. The client must not decode
+    responses; Redis failures are logged and treated as misses.
+    """
+    redis: Optional[Redis] = None
+    prefix = "contacts:cache:"
+    poll_interval = 0.05
+
+    def __init__(self,
+                 ttl: int,
+                 lock_ttl: float,
+                 wait: float) -> None:
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait = wait
+        self.hits = 0
+        self.misses = 0
+        self.waited_hits = 0
+
+    @classmethod
+    def init(cls, redis: Redis) -> None:
+        cls.redis = redis
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            raw = await self.redis.get(self.prefix + key)
+        except RedisError as e:
+            logger.warning(f"contacts cache read failed: {e}")
+            return None
+        return zlib.decompress(raw) if raw is not None else None
+
+    async def set(self, key: str, body: bytes) -> None:
+        try:
+            await self.redis.set(self.prefix + key, zlib.compress(body),
+                                 ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"contacts cache write failed: {e}")
+
+    async def lock(self, key: str) -> bool:
+        try:
+            return bool(await self.redis.set(self.prefix + key + ":lock",
+                                             os.getpid(), nx=True,
+                                             px=int(self.lock_ttl * 1000)))
+        except RedisError as e:
+            logger.warning(f"contacts cache lock failed: {e}")
+            return True
+
+    async def unlock(self, key: str) -> None:
+        try:
+            await self.redis.delete(self.prefix + key + ":lock")
+        except RedisError as e:
+            logger.warning(f"contacts cache unlock failed: {e}")
+
+    async def fetch(self,
+                    key: str,
+                    render: Callable[[], Awaitable[Response]]
+                    ) -> tuple[Optional[bytes], Optional[Response]]:
+        """
+        Return (cached body, None) on a hit, otherwise (None, response)
+        with the rendered response, whose body is cached if it is a 200.
+        """
+        body = await self.get(key)
+        if body is not None:
+            self.hits += 1
+            return body, None
+
+        locked = await self.lock(key)
+        if not locked:
+            deadline = time.monotonic() + self.wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                body = await self.get(key)
+                if body is not None:
+                    self.waited_hits += 1
+                    return body, None
+
+        self.misses += 1
+        try:
+            response = await render()
+            if response.status_code == status.HTTP_200_OK:
+                await self.set(key, response.body)
+        finally:
+            if locked:
+                await self.unlock(key)
+        return None, response
+
+    def stats(self) -> dict[str, float]:
+        hits = self.hits + self.waited_hits
+        total = hits + self.misses
+        return {"hits": self.hits,
+                "waited_hits": self.waited_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / total, 4) if total else 0.0}
+
+
+contact_cache = ContactCache(ttl=settings.contacts_cache_ttl,
+                             lock_ttl=settings.contacts_cache_lock_ttl,
+                             wait=settings.contacts_cache_wait)
+
+
+async def cached_response(request: Request,
+                          owner: int,
+                          render: Callable[[], Awaitable[Response]],
+                          *vary: str) -> Response:
+    """
+    Answer a contacts read from If-None-Match or the cache, rendering it
+    only when both miss. vary adds inputs other than the URL that change
+    the response, like the current date.
+    """
+    version = await contact_versions.get(owner)
+    if version is None:
+        return await render()
+    digest = request_digest(owner, request, *vary)
+    etag = make_etag(version, digest)
+    if not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers={"ETag": etag})
+    if contact_cache.redis is None:
+        response = await render()
+    else:
+        body, response = await contact_cache.fetch(f"{owner}:{version:x}:"
+                                                   f"{digest}", render)
+        if body is not None:
+            return Response(body, media_type="application/json",
+                            headers={"ETag": etag})
+    if response.status_code == status.HTTP_200_OK:
+        response.headers["ETag"] = etag
+    return response
@@ -0,0 +1,305 @@
+import codecs
+import csv
+import io
+import json
+import re
+from typing import Any, AsyncIterator, Iterable, Literal, Sequence, TypeAlias
+
+ContactFormat: TypeAlias = Literal["csv", "ndjson", "vcf"]
+
+Record: TypeAlias = tuple[int, dict[str, Any] | ValueError]
+
+# a line, or the error standing in for one that was too long to keep
+Line: TypeAlias = str | ValueError
+
+# longest line, and CSV record, kept in memory while it is being read
+MAX_RECORD_LENGTH = 64 * 1024
+
+
+async def iter_lines(chunks: AsyncIterator[bytes],
+                     max_length: int = MAX_RECORD_LENGTH
+                     ) -> AsyncIterator[Line]:
+    """
+    Split a byte stream into text lines without buffering the whole body.
+    Only the newly decoded text is searched for line breaks; a line longer
+    than max_length characters is dropped as it arrives and yielded as
+    a ValueError.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = []
+    length = 0
+
+    def end_line(last: str) -> Line:
+        nonlocal pending, length
+        too_long = length + len(last) > max_length
+        line = "".join(pending) + last
+        pending, length = [], 0
+        if too_long:
+            return ValueError(f"line longer than {max_length} characters")
+        return line.rstrip("\r")
+
+    async for chunk in chunks:
+        *lines, last = decoder.decode(chunk).split("\n")
+        for line in lines:
+            yield end_line(line)
+        length += len(last)
+        # past the cap only the length of the line is kept
+        if length <= max_length:
+            pending.append(last)
+        else:
+            pending = []
+    last = decoder.decode(b"", final=True)
+    if length or last:
+        yield end_line(last)
+
+
+async def parse_csv(lines: AsyncIterator[Line],
+                    max_length: int = MAX_RECORD_LENGTH
+                    ) -> AsyncIterator[Record]:
+    """
+    Yield (row number, record) for a CSV stream whose first line is
+    a header with Contact field names. A record longer than max_length
+    characters, e.g. behind a stray quote, is skipped as an error instead
+    of being buffered.
+    """
+    header = None
+    pending = []
+    length = 0
+    quotes = 0
+    row = 0
+    async for line in lines:
+        if isinstance(line, ValueError):
+            # the quotes of a dropped line are unknown, it ends its record
+            if header is not None:
+                row += 1
+            yield row, line
+            pending, length, quotes = [], 0, 0
+            continue
+        quotes += line.count('"')
+        length += len(line) + 1
+        if length <= max_length:
+            pending.append(line)
+        # a quoted field may span several lines
+        if quotes % 2:
+            continue
+        text = "\n".join(pending)
+        too_long = length > max_length
+        pending, length, quotes = [], 0, 0
+        if too_long:
+            if header is not None:
+                row += 1
+            yield row, ValueError(f"record longer than {max_length} "
+                                  f"characters")
+            continue
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, ValueError(f"expected {len(header)} columns, "
+                                  f"got {len(values)}")
+            continue
+        yield row, {name: value or None
+                    for name, value in zip(header, values)}
+    if length:
+        yield row + 1, ValueError("unterminated quoted field")
+
+
+async def parse_ndjson(lines: AsyncIterator[Line]) -> AsyncIterator[Record]:
+    """Yield (row number, record) for a stream of JSON objects, one per line."""
+    row = 0
+    async for line in lines:
+        if isinstance(line, ValueError):
+            row += 1
+            yield row, line
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, ValueError(f"invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield row, ValueError("expected a JSON object")
+            continue
+        yield row, record
+
+
+VCARD_FIELDS = {"FN": "full_name",
+                "EMAIL": "email",
+                "TEL": "phone",
+                "BDAY": "birthday",
+                "NOTE": "extra"}
+
+
+VCARD_ESCAPES = {"\\": "\\", ",": ",", ";": ";", "n": "\n", "N": "\n"}
+VCARD_ESCAPE_RE = re.compile(r"\\(.)")
+VCARD_COMPONENT_RE = re.compile(r"\\.|;|[^\\;]+|\\")
+
+
+def vcard_unescape(value: str) -> str:
+    """Undo vcard_escape in one left-to-right pass."""
+    return VCARD_ESCAPE_RE.sub(
+        lambda match: VCARD_ESCAPES.get(match[1], match[0]), value)
+
+
+def vcard_components(value: str) -> list[str]:
+    """Split a structured value like N on the ;s that are not escaped."""
+    components = [""]
+    for token in VCARD_COMPONENT_RE.findall(value):
+        if token == ";":
+            components.append("")
+        else:
+            components[-1] += token
+    return [vcard_unescape(component) for component in components]
+
+
+def vcard_record(properties: list[tuple[str, str]]) -> dict[str, Any]:
+    record = {}
+    for name, value in properties:
+        if name == "N":
+            last, first, *_ = vcard_components(value) + [""]
+            record.setdefault("first_name", first or None)
+            record.setdefault("last_name", last or None)
+        elif name in VCARD_FIELDS:
+            record.setdefault(VCARD_FIELDS[name],
+                              vcard_unescape(value) or None)
+    full_name = record.pop("full_name", None)
+    if not record.get("first_name") and full_name:
+        first, _, last = full_name.partition(" ")
+        record["first_name"] = first
+        record["last_name"] = last or None
+    if record.get("phone"):
+        record["phone"] = "".join(ch for ch in record["phone"]
+                                  if ch.isdigit())
+    if record.get("birthday") and len(record["birthday"]) == 8:
+        bday = record["birthday"]
+        record["birthday"] = f"{bday[:4]}-{bday[4:6]}-{bday[6:]}"
+    return record
+
+
+async def unfold(lines: AsyncIterator[Line],
+                 max_length: int = MAX_RECORD_LENGTH) -> AsyncIterator[Line]:
+    """
+    Join folded vCard lines (continuations start with whitespace),
+    dropping a property longer than max_length characters as a ValueError.
+    """
+    previous = None
+    async for line in lines:
+        if isinstance(line, str) and line[:1] in (" ", "\t") \
+                and previous is not None:
+            if isinstance(previous, str):
+                previous += line[1:]
+                if len(previous) > max_length:
+                    previous = ValueError(f"line longer than {max_length} "
+                                          f"characters")
+            continue
+        if previous is not None:
+            yield previous
+        previous = line
+    if previous is not None:
+        yield previous
+
+
+async def parse_vcard(lines: AsyncIterator[Line]) -> AsyncIterator[Record]:
+    """
+    Yield (card number, record) for a stream of vCard 3.0/4.0 cards;
+    a card with a line that was too long is reported as that error.
+    """
+    row = 0
+    properties = None
+    error = None
+    async for line in unfold(lines):
+        if isinstance(line, ValueError):
+            if properties is not None:
+                error = error or line
+            continue
+        name, _, value = line.partition(":")
+        name = name.split(";")[0].split(".")[-1].upper()
+        if name == "BEGIN":
+            properties, error = [], None
+        elif name == "END":
+            if properties is not None:
+                row += 1
+                yield row, error or vcard_record(properties)
+            properties = None
+        elif properties is not None:
+            properties.append((name, value))
+    if properties is not None:
+        yield row + 1, error or ValueError("unterminated vCard")
+
+
+PARSERS = {"csv": parse_csv,
+           "ndjson": parse_ndjson,
+           "vcf": parse_vcard}
+
+
+def parse_stream(chunks: AsyncIterator[bytes],
+                 fmt: ContactFormat) -> AsyncIterator[Record]:
+    return PARSERS[fmt](iter_lines(chunks))
+
+
+EXPORT_FIELDS = ("id", "first_name", "last_name", "email",
+                 "phone", "birthday", "extra")
+
+MEDIA_TYPES = {"csv": "text/csv",
+               "ndjson": "application/x-ndjson",
+               "vcf": "text/vcard"}
+
+
+def csv_header() -> str:
+    return ",".join(EXPORT_FIELDS) + "\r\n"
+
+
+def serialize_csv(rows: Iterable[Sequence[Any]]) -> str:
+    """Serialize rows of EXPORT_FIELDS values as CSV lines."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(["" if value is None else value for value in row]
+                     for row in rows)
+    return buffer.getvalue()
+
+
+def serialize_ndjson(rows: Iterable[Sequence[Any]]) -> str:
+    """Serialize rows of EXPORT_FIELDS values as JSON objects, one per line."""
+    return "".join(json.dumps(dict(zip(EXPORT_FIELDS, row)),
+                              default=str, ensure_ascii=False) + "\n"
+                   for row in rows)
+
+
+def vcard_escape(value: Any) -> str:
+    return (str(value).replace("\\", "\\\\")
+            .replace(",", "\\,")
+            .replace(";", "\\;")
+            .replace("\n", "\\n"))
+
+
+def serialize_vcard(rows: Iterable[Sequence[Any]]) -> str:
+    """Serialize rows of EXPORT_FIELDS values as vCard 3.0 cards."""
+    cards = []
+    for id_, first, last, email, phone, birthday, extra in rows:
+        lines = ["BEGIN:VCARD", "VERSION:3.0",
+                 f"N:{vcard_escape(last or '')};{vcard_escape(first)};;;",
+                 f"FN:{vcard_escape(' '.join(filter(None, (first, last))))}",
+                 f"UID:contact-{id_}"]
+        if email:
+            lines.append(f"EMAIL:{vcard_escape(email)}")
+        if phone:
+            lines.append(f"TEL:{vcard_escape(phone)}")
+        if birthday:
+            lines.append(f"BDAY:{birthday.strftime('%Y%m%d')}")
+        if extra:
+            lines.append(f"NOTE:{vcard_escape(extra)}")
+        lines.append("END:VCARD")
+        cards.append("\r\n".join(lines) + "\r\n")
+    return "".join(cards)
+
+
+SERIALIZERS = {"csv": serialize_csv,
+               "ndjson": serialize_ndjson,
+               "vcf": serialize_vcard}
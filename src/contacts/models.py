@@ -5,6 +5,7 @@ from pydantic import (BaseModel,
                       Field,
                       PastDate,
                       computed_field,
+                      field_validator,
                       ConfigDict)
 
 
@@ -36,5 +37,59 @@ class ContactResponse(Contact):
     id: int
 
 
+class CreateResult(BaseModel):
+    """Outcome of creating one contact of a list"""
+    status: int
+    contact: Optional[ContactResponse] = None
+    msg: Optional[str] = None
+
+
+class ContactPatch(BaseModel):
+    """Partial update of a contact, only the fields sent are changed"""
+    id: int
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = Field(min_length=6,
+                                 max_length=15,
+                                 pattern=r'[0-9]*',
+                                 default=None)
+    birthday: Optional[PastDate] = None
+    extra: Optional[Any] = None
+
+    @field_validator("first_name")
+    @classmethod
+    def first_name_required(cls, value: Optional[str]) -> str:
+        if value is None:
+            raise ValueError("first_name can not be removed")
+        return value
+
+
+class PatchResult(BaseModel):
+    """Outcome of a partial update for one contact"""
+    id: int
+    status: int
+    msg: Optional[str] = None
+
+
+class ContactPage(BaseModel):
+    """One page of contacts and the cursor to request the next one"""
+    items: list[ContactResponse]
+    next_cursor: Optional[int] = None
+
+
+class ImportRowError(BaseModel):
+    """Why a row of an imported file was not stored"""
+    row: int
+    msg: str
+
+
+class ImportReport(BaseModel):
+    """Outcome of a bulk contacts import"""
+    inserted: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+
+
 if __name__ == "__main__":
     print([_ for _ in Contact.model_fields])
@@ -1,47 +1,103 @@
 from datetime import date
 from typing import Optional, Any
 
-from sqlalchemy import String, Date, Text, ForeignKey
+from sqlalchemy import (String, Date, Text, ForeignKey, SmallInteger, Index,
+                        Computed, DDL, event)
 from sqlalchemy.orm import Mapped, mapped_column
 
-from db import Base, get_db
+from db import Base
 
+SEARCH_FIELDS = ("full_name", "email", "phone")
 
-def full_name_calculated_default(context) -> str:
-    first = context.get_current_parameters().get('first_name')
-    last = context.get_current_parameters().get('last_name')
-    last = f" {last}" if last is not None else ""
-    return f"{first}{last}"
+# same value as Contact.full_name, generated by the database on every write
+FULL_NAME_SQL = "first_name || coalesce(' ' || nullif(last_name, ''), '')"
 
 
-def full_name_calculated_update(context) -> Any:
-    first = context.get_current_parameters().get('first_name')
-    last = context.get_current_parameters().get('last_name')
-    id_ = context.get_current_parameters().get('id_1')
-    if id_ is None:
-        return
-    with get_db() as session:
-        current = session.get(ContactORM, id_)
-        first = first if first is not None else current.first_name
-        last = last if last is not None else current.last_name
-    last = f" {last}" if last is not None else ""
-    return f"{first}{last}"
+def month_day(birthday: Optional[date]) -> Optional[int]:
+    """Encode birthday as MMDD integer, so calendar order is numeric order"""
+    if birthday is None:
+        return None
+    return birthday.month * 100 + birthday.day
+
+
+def birthday_md_calculated_default(context) -> Optional[int]:
+    return month_day(context.get_current_parameters().get('birthday'))
 
 
 class ContactORM(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # every route filters by owner first
+        Index("ix_contacts_owner_id", "owner", "id"),
+        *(Index(f"ix_contacts_owner_{field}", "owner", field)
+          for field in SEARCH_FIELDS),
+        Index("ix_contacts_owner_birthday_md", "owner", "birthday_md"),
+        *(Index(f"ix_contacts_{field}_trgm", field,
+                postgresql_using="gin",
+                postgresql_ops={field: "gin_trgm_ops"})
+          .ddl_if(dialect="postgresql")
+          for field in SEARCH_FIELDS),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(20))
     last_name:  Mapped[Optional[str]] = mapped_column(String(20))
     full_name: Mapped[str] = mapped_column(String(),
-                                           unique=True,
-                                           default=full_name_calculated_default,
-                                           onupdate=full_name_calculated_update)
+                                           Computed(FULL_NAME_SQL,
+                                                    persisted=True),
+                                           unique=True)
     phone: Mapped[Optional[str]] = mapped_column(String(15))
     email: Mapped[Optional[str]] = mapped_column(String(80),
                                                  unique=True)
     birthday: Mapped[Optional[date]] = mapped_column(Date())
+    birthday_md: Mapped[Optional[int]] = mapped_column(
+        SmallInteger(),
+        default=birthday_md_calculated_default
+    )
     extra: Mapped[Optional[Any]] = mapped_column(Text())
     owner: Mapped[int] = mapped_column(ForeignKey("users.id"),
                                        default=1)
+
+
+# Search backends: pg_trgm GIN indexes on Postgres (declared above),
+# an external-content FTS5 trigram table kept in sync by triggers on SQLite.
+event.listen(
+    ContactORM.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    .execute_if(dialect="postgresql")
+)
+
+FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts
+        USING fts5(full_name, email, phone,
+                   content='contacts', content_rowid='id',
+                   tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ai
+        AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts(rowid, full_name, email, phone)
+            VALUES (new.id, new.full_name, new.email, new.phone);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_ad
+        AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid,
+                                     full_name, email, phone)
+            VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS contacts_fts_au
+        AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid,
+                                     full_name, email, phone)
+            VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+            INSERT INTO contacts_fts(rowid, full_name, email, phone)
+            VALUES (new.id, new.full_name, new.email, new.phone);
+        END""",
+)
+
+for statement in FTS_DDL:
+    event.listen(ContactORM.__table__, "after_create",
+                 DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(
+    ContactORM.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS contacts_fts").execute_if(dialect="sqlite")
+)
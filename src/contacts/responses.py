@@ -0,0 +1,43 @@
+from typing import Any, Iterable, Optional, Sequence
+
+import orjson
+from starlette.responses import Response
+
+from contacts.models import ContactResponse
+from contacts.orms import ContactORM
+
+# keys in ContactResponse order, full_name is read from its stored column
+RESPONSE_FIELDS = (*ContactResponse.model_fields,
+                   *ContactResponse.model_computed_fields)
+
+RESPONSE_COLUMNS = tuple(getattr(ContactORM, field)
+                         for field in RESPONSE_FIELDS)
+
+
+def contact_dicts(rows: Iterable[Sequence[Any]]) -> list[dict[str, Any]]:
+    """Map rows selected with RESPONSE_COLUMNS to ContactResponse dicts."""
+    return [dict(zip(RESPONSE_FIELDS, row)) for row in rows]
+
+
+class ContactsJSONResponse(Response):
+    """
+    JSON response for rows selected with RESPONSE_COLUMNS.
+
+    Routes return it instead of ContactResponse models, which skips both
+    model construction and FastAPI's response_model validation; the rows
+    already come from the database in the response shape.
+    """
+    media_type = "application/json"
+
+    def __init__(self,
+                 rows: Iterable[Sequence[Any]],
+                 next_cursor: Optional[int] = None,
+                 paged: bool = False,
+                 **kwargs) -> None:
+        items = contact_dicts(rows)
+        content = {"items": items, "next_cursor": next_cursor} \
+            if paged else items
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -1,20 +1,31 @@
-import re
 from datetime import date, timedelta
-from typing import Any, TypeAlias, Literal, List, Annotated
-
-from fastapi import APIRouter, Depends, status
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy import column
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from typing import Any, TypeAlias, Literal, List, Annotated, Optional, Union
+
+from fastapi import APIRouter, Body, Depends, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy import select, update, case, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from starlette.responses import Response
 
 import db
-from contacts.orms import ContactORM
-from contacts.models import Contact, ContactResponse
+from contacts.orms import ContactORM, month_day
+from contacts.models import (Contact, ContactResponse, ContactPage,
+                             ContactPatch, PatchResult, CreateResult,
+                             ImportReport, ImportRowError)
+from contacts.responses import (RESPONSE_COLUMNS, ContactsJSONResponse,
+                                contact_dicts)
+from contacts.search import search_contacts
+from contacts.versions import contact_versions
+from contacts.cache import cached_response
+from contacts.service import insert_contacts, patch_contacts
+from contacts.formats import (ContactFormat, parse_stream, csv_header,
+                              EXPORT_FIELDS, MEDIA_TYPES, SERIALIZERS)
 from users.orms import User
 from auth.service import Authentication
+from ratelimit.limiter import rate_limit
+from settings import settings
 
 router = APIRouter(prefix='/contacts',
                    tags=['contacts'])
@@ -32,89 +43,207 @@ def get_field_names(model: "BaseModel") -> List[str]:
 ContactFields: TypeAlias = Literal[*get_field_names(Contact)]
 
 
-@router.get("/", dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+def field_values(field: str, value: Any) -> dict[str, Any]:
+    """
+    Return UPDATE values for the field, keeping birthday_md in sync.
+    full_name is generated by the database, so it is set through
+    first_name and last_name.
+    """
+    if field == "full_name":
+        first, _, last = value.partition(" ")
+        return {"first_name": first, "last_name": last or None}
+    if field == "birthday":
+        birthday = date.fromisoformat(value) \
+            if isinstance(value, str) else value
+        return {"birthday": birthday, "birthday_md": month_day(birthday)}
+    return {field: value}
+
+
+async def update_contact(db: AsyncSession,
+                         contact_id: int,
+                         owner: int,
+                         values: dict[str, Any],
+                         *conditions) -> Optional[int]:
+    """
+    Update a user-owned contact with one UPDATE ... RETURNING statement.
+
+    Returns:
+        id of the updated contact or None if the contact does not exist
+        or does not satisfy conditions
+    """
+    updated = await db.scalar(
+        update(ContactORM)
+        .filter(ContactORM.id == contact_id,
+                ContactORM.owner == owner,
+                *conditions)
+        .values(values)
+        .returning(ContactORM.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if updated is not None:
+        await contact_versions.bump(owner)
+    return updated
+
+
+async def contact_exists(db: AsyncSession,
+                         contact_id: int,
+                         owner: int) -> bool:
+    return await db.scalar(select(ContactORM.id)
+                           .filter(ContactORM.id == contact_id,
+                                   ContactORM.owner == owner)) is not None
+
+
+def contact_not_found(contact_id: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "details": [
+                {"type": "ValueError"},
+                {"msg": f"Contact with id {contact_id} not found"}
+            ]
+        }
+    )
+
+
+def invalid_value(field: str, value: Any) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content={
+            "details": [
+                {"type": "ValueError"},
+                {"msg": f"Invalid value {value} for {field}"}
+            ]
+        })
+
+
+@router.get("/",
+            response_model=ContactPage,
+            dependencies=[Depends(rate_limit)])
 async def read(
+        request: Request,
         user: Annotated[User, Depends(auth_service.get_access_user)],
-        db: Session = Depends(db.get_db)
-) -> list[ContactResponse]:
+        db: AsyncSession = Depends(db.get_db),
+        limit: Annotated[int, Query(ge=1, le=settings.contacts_page_max)]
+        = settings.contacts_page_size,
+        after: Annotated[Optional[int], Query(ge=0)] = None
+) -> Any:
     """
-    Return all contacts from the database.
+    Return one page of user-owned contacts ordered by id.
     Args:
+        request (Request): request checked for If-None-Match
+            and used as the cache key
         user (User): user retrieved from 'users' with valid credentials
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
+        limit (int): page size, capped by settings.contacts_page_max
+        after (int): cursor from the previous page (next_cursor),
+            None for the first page
 
     Returns:
-        list of contacts (ContactResponse) or empty list
+        ContactPage with contacts (ContactResponse) and next_cursor,
+        which is None on the last page, or an empty 304 response if the
+        ETag sent in If-None-Match is still current
     """
-    return [ContactResponse.from_orm(_) for _ in db.query(ContactORM)\
-            .filter(ContactORM.owner == user.id).all()]
+    async def render() -> Response:
+        query = select(*RESPONSE_COLUMNS)\
+            .filter(ContactORM.owner == user.id)\
+            .order_by(ContactORM.id)\
+            .limit(limit + 1)
+        if after is not None:
+            query = query.filter(ContactORM.id > after)
+        res = (await db.execute(query)).all()
+
+        next_cursor = res[limit - 1].id if len(res) > limit else None
+        return ContactsJSONResponse(res[:limit],
+                                    next_cursor=next_cursor,
+                                    paged=True)
+
+    return await cached_response(request, user.id, render)
 
 
 @router.get("/{contact_id:int}",
             response_model=ContactResponse,
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def read_id(contact_id: int,
+                  request: Request,
                   user: Annotated[User, Depends(auth_service.get_access_user)],
-                  db: Session = Depends(db.get_db)
+                  db: AsyncSession = Depends(db.get_db)
                   ) -> Any:
     """
     Retrieves a contact by id.
     Args:
         contact_id (int): identifier of contact in database
+        request (Request): request checked for If-None-Match
+            and used as the cache key
         user (User): user retrieved from 'users' with valid credentials,
             also serves as an access filter to user-owned contacts only
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
 
     Returns:
         ContactResponse model or JSONResponse with status 404 if contact with
-        specified id not found in user-owned contacts
+        specified id not found in user-owned contacts, or an empty 304
+        response if the ETag sent in If-None-Match is still current
     """
-    res = db.query(ContactORM.id == contact_id,
-                   ContactORM.owner == user.id).first()
+    async def render() -> Response:
+        res = (await db.execute(select(*RESPONSE_COLUMNS)
+                                .filter(ContactORM.id == contact_id,
+                                        ContactORM.owner == user.id))).first()
 
-    if res is None:
-        return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,
-                            content=f"Contact with id {contact_id} not found")
-    return ContactResponse.from_orm(res)
+        if res is None:
+            return JSONResponse(status_code=status.HTTP_404_NOT_FOUND,
+                                content=f"Contact with id {contact_id} not found")
+        return ORJSONResponse(contact_dicts([res])[0])
+
+    return await cached_response(request, user.id, render)
 
 
 @router.post("/",
-             response_model=ContactResponse,
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             response_model=Union[ContactResponse, List[CreateResult]],
+             dependencies=[Depends(rate_limit)])
 async def create(
-        contact: Contact,
+        contact: Union[Contact, List[Contact]],
         user: Annotated[User, Depends(auth_service.get_access_user)],
-        db: Session = Depends(db.get_db)
+        db: AsyncSession = Depends(db.get_db)
 ) -> Any:
     """
-    Create a new contact.
+    Create a new contact or a list of them.
+
+    All contacts are stored with one multi-row INSERT ... RETURNING, so the
+    response is built from the stored rows without reading them back.
+
     Args:
-        contact (Contact): model with new contact information
+        contact (Contact | List[Contact]): model with new contact
+            information or a list of up to settings.contacts_import_batch
+            of them
         user (User): user retrieved from 'users' with valid credentials,
             also serves as an access filter to user-owned contacts only
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
 
     Returns:
-        ContactResponse model or JSONResponse with statuses 409 (for contact with
-        duplicate unique fields) or 422 (for unprocessable data)
+        for a single contact ContactResponse model or JSONResponse with
+        statuses 409 (for contact with duplicate unique fields) or 422
+        (for unprocessable data);
+        for a list, CreateResult per contact in request order with status
+        201 and the stored contact or 409 for duplicate unique fields
     """
-    db.add(ContactORM(**contact.model_dump(exclude={'full_name'}), owner=user.id))
+    contacts = contact if isinstance(contact, list) else [contact]
+    if len(contacts) > settings.contacts_import_batch:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={
+                "details": [
+                    {"type": "ValueError"},
+                    {"msg": f"Up to {settings.contacts_import_batch}"
+                            " contacts per request. Use /contacts/import"
+                            " for more."}
+                ]
+            })
     try:
-        db.commit()
-    except IntegrityError as e:
-        db.rollback()
-        if re.search(r"UNIQUE constraint failed", str(e)):
-            return JSONResponse(
-                status_code=status.HTTP_409_CONFLICT,
-                content={
-                    "details": [
-                        {"type":
-                         "ValueError"},
-                        {"msg":
-                         "Contact with such fullname or email already exists"}
-                    ]})
-    except Exception:
-        db.rollback()
+        rows = await insert_contacts(db, owner=user.id, contacts=contacts)
+        await db.commit()
+        await contact_versions.bump(user.id)
+    except SQLAlchemyError:
+        await db.rollback()
         return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                             content={
                                 "details": [
@@ -123,79 +252,275 @@ async def create(
                                 ]
                             }
                             )
-    res = db.query(ContactORM).filter_by(first_name=contact.first_name,
-                                         last_name=contact.last_name).first()
-    return ContactResponse.from_orm(res)
+
+    if isinstance(contact, list):
+        return [
+            CreateResult(status=status.HTTP_201_CREATED,
+                         contact=ContactResponse.model_validate(row))
+            if row is not None else
+            CreateResult(status=status.HTTP_409_CONFLICT,
+                         msg="Contact with such fullname or email"
+                             " already exists")
+            for row in rows
+        ]
+    if rows[0] is None:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "details": [
+                    {"type":
+                     "ValueError"},
+                    {"msg":
+                     "Contact with such fullname or email already exists"}
+                ]})
+    return ContactResponse.model_validate(rows[0])
+
+
+@router.patch("/",
+              response_model=List[PatchResult],
+              dependencies=[Depends(rate_limit)])
+async def patch(
+        patches: Annotated[List[ContactPatch],
+                           Body(min_length=1,
+                                max_length=settings.contacts_patch_max)],
+        user: Annotated[User, Depends(auth_service.get_access_user)],
+        db: Annotated[AsyncSession, Depends(db.get_db)]
+) -> Any:
+    """
+    Partially update several contacts at once.
+
+    Every item carries a contact id and only the fields to change; a field
+    sent as null is cleared. Items changing the same set of fields are
+    written with one batched UPDATE, all of them in a single transaction.
+
+    Args:
+        patches (List[ContactPatch]): partial updates, up to
+            settings.contacts_patch_max per request
+        user (User): user retrieved from 'users' with valid credentials,
+            also serves as an access filter to user-owned contacts only
+        db (AsyncSession): session object used for database operations
+
+    Returns:
+        list of PatchResult in request order with status codes:
+        200 - contact updated
+        404 - user-owned contact with specified id is not found
+        409 - new data clashes with another contact's fullname or email
+        422 - nothing to update or the contact is patched twice
+    """
+    results = await patch_contacts(db, user.id, patches)
+    # a batch of 404s and 409s changed nothing, cached pages stay valid
+    if any(result.status == status.HTTP_200_OK for result in results):
+        await contact_versions.bump(user.id)
+    return results
+
+
+@router.post("/import",
+             response_model=ImportReport,
+             dependencies=[Depends(rate_limit)])
+async def import_contacts(
+        request: Request,
+        user: Annotated[User, Depends(auth_service.get_access_user)],
+        db: Annotated[AsyncSession, Depends(db.get_db)],
+        format: ContactFormat = "csv"
+) -> Any:
+    """
+    Import contacts from a CSV, NDJSON or vCard request body.
+
+    The body is parsed while it streams in; rows are validated against
+    Contact and stored by batches of settings.contacts_import_batch with
+    one multi-row INSERT each, every batch in its own transaction. A batch
+    the database rejects is rolled back and retried row by row, so only
+    the offending rows are reported.
+
+    Args:
+        request (Request): request with the file as its raw body
+        user (User): user retrieved from 'users' with valid credentials,
+            becomes the owner of imported contacts
+        db (AsyncSession): session object used for database operations
+        format (ContactFormat): csv (with a header of Contact field
+            names), ndjson or vcf
+
+    Returns:
+        ImportReport with inserted and failed counts and per-row errors
+        (the first settings.contacts_import_max_errors of them)
+    """
+    report = ImportReport()
+
+    def fail(row: int, msg: str) -> None:
+        report.failed += 1
+        if len(report.errors) < settings.contacts_import_max_errors:
+            report.errors.append(ImportRowError(row=row, msg=msg))
+
+    async def flush(batch: list[tuple[int, Contact]]) -> None:
+        try:
+            stored = await insert_contacts(db,
+                                           owner=user.id,
+                                           contacts=[contact
+                                                     for _, contact in batch])
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            if len(batch) == 1:
+                reason = str(getattr(e, "orig", None) or e).splitlines()[0]
+                fail(batch[0][0], f"Contact could not be stored: {reason}")
+                return
+            # one bad row fails the whole INSERT, so find it row by row
+            for item in batch:
+                await flush([item])
+            return
+        await contact_versions.bump(user.id)
+        for (row, _), contact_row in zip(batch, stored):
+            if contact_row is None:
+                fail(row, "Contact with such fullname or email already exists")
+            else:
+                report.inserted += 1
+
+    batch = []
+    async for row, record in parse_stream(request.stream(), format):
+        if isinstance(record, ValueError):
+            fail(row, str(record))
+            continue
+        try:
+            batch.append((row, Contact.model_validate(record)))
+        except ValidationError as e:
+            fail(row, "; ".join(f"{'.'.join(map(str, err['loc']))}: "
+                                f"{err['msg']}" for err in e.errors()))
+            continue
+        if len(batch) >= settings.contacts_import_batch:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+    return report
+
+
+@router.get("/export",
+            response_class=StreamingResponse,
+            dependencies=[Depends(rate_limit)])
+async def export_contacts(
+        user: Annotated[User, Depends(auth_service.get_access_user)],
+        sessions: Annotated[async_sessionmaker[AsyncSession],
+                            Depends(db.get_sessionmaker)],
+        format: ContactFormat = "csv"
+) -> Any:
+    """
+    Stream all user-owned contacts as a CSV, NDJSON or vCard file.
+
+    Rows are read through a server-side cursor in partitions of
+    settings.contacts_export_chunk and serialized straight from the row
+    tuples, so memory use does not grow with the address book.
+
+    Args:
+        user (User): user retrieved from 'users' with valid credentials,
+            also serves as an access filter to user-owned contacts only
+        sessions (async_sessionmaker): factory of the session the stream
+            reads through
+        format (ContactFormat): csv, ndjson or vcf
+
+    Returns:
+        StreamingResponse with the file as an attachment
+    """
+    serialize = SERIALIZERS[format]
+    query = select(*(getattr(ContactORM, field) for field in EXPORT_FIELDS))\
+        .filter(ContactORM.owner == user.id)\
+        .order_by(ContactORM.id)\
+        .execution_options(yield_per=settings.contacts_export_chunk)
+
+    async def chunks():
+        if format == "csv":
+            yield csv_header()
+        # the request session is closed before streaming starts,
+        # so the generator holds its own for the cursor's lifetime
+        async with sessions() as session:
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                yield serialize(partition)
+
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition":
+                 f"attachment; filename=contacts.{format}"}
+    )
 
 
 @router.get("/find",
             response_model=List[ContactResponse],
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def find_contact(
         value: str,
-        db: Annotated[Session, Depends(db.get_db)],
+        request: Request,
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)],
-        field: ContactFields = "full_name"
+        field: ContactFields = "full_name",
+        limit: Annotated[int, Query(ge=1, le=settings.contacts_page_max)]
+        = settings.contacts_page_size,
+        offset: Annotated[int, Query(ge=0)] = 0
 ) -> Any:
     """
-       Create a new contact.
+       Search contacts, best matches first.
        Args:
            field (ContactFields): field to search in contacts
-           value (str): value to search in field
+           value (str): value to search in field, empty value searches
+               for contacts without this field
+           request (Request): request checked for If-None-Match
+               and used as the cache key
            user (User): user retrieved from 'users' with valid credentials,
                also serves as an access filter to user-owned contacts only
-           db (Session): session object used for database operations
+           db (AsyncSession): session object used for database operations
+           limit (int): page size, capped by settings.contacts_page_max
+           offset (int): number of ranked results to skip
 
        Returns:
            list of contacts (ContactResponse) or JSONResponse with status code 404
            if there are no result for specified search condictions
     """
-    if field != "full_name":
+    async def render() -> Response:
         if len(value) == 0:
-            res = db.query(ContactORM)\
-                .filter(column(field).is_(None),
-                        ContactORM.owner == user.id).all()
+            res = (await db.execute(select(*RESPONSE_COLUMNS)
+                   .filter(getattr(ContactORM, field).is_(None),
+                           ContactORM.owner == user.id)
+                   .order_by(ContactORM.id)
+                   .limit(limit)
+                   .offset(offset))).all()
         else:
-            search_condition = f"%{value}%"
-            res = db.query(ContactORM)\
-                .filter(column(field).like(search_condition),
-                        ContactORM.owner == user.id).all()
+            res = await search_contacts(db,
+                                        owner=user.id,
+                                        field=field,
+                                        value=value,
+                                        limit=limit,
+                                        offset=offset)
 
         if len(res) == 0:
             return JSONResponse(status_code=404,
                                 content={
                                     "details": [
                                         {
-                                            "msg": f"There is no result for {field}={value} "
+                                            "msg": f"There is no result for {field}={value}"
                                         }
                                     ]
                                 })
-        return [ContactResponse.from_orm(_) for _ in res]
+        return ContactsJSONResponse(res)
 
-    res = db.query(ContactORM)\
-            .filter(ContactORM.full_name == value)
-    if len(res) == 0:
-        return JSONResponse(status_code=404,
-                            content={
-                                "details": [
-                                    {
-                                        "msg": f"There is no result for {field}={value}"
-                                    }
-                                ]
-                            })
-    return [ContactResponse.from_orm(_) for _ in res]
+    return await cached_response(request, user.id, render)
 
 
 @router.get("/bd_mates",
             response_model=List[ContactResponse],
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def get_birthday_mates_default(
-        db: Session = Depends(db.get_db)
+        request: Request,
+        user: Annotated[User, Depends(auth_service.get_access_user)],
+        db: AsyncSession = Depends(db.get_db)
 ) -> Any:
     """
     Return contacts with birthday in the next 7 days.
     Args:
-        db (Session): session object used for database operations
+        request (Request): request checked for If-None-Match
+            and used as the cache key
+        user (User): user retrieved from 'users' with valid credentials,
+               also serves as an access filter to user-owned contacts only
+        db (AsyncSession): session object used for database operations
 
    Returns:
        list of contacts (ContactResponse) or JSONResponse with 404 status code
@@ -203,16 +528,19 @@ async def get_birthday_mates_default(
     """
     return await get_birthday_mates(
         days=7,
-        db=db
+        request=request,
+        db=db,
+        user=user
     )
 
 
 @router.get("/bd_mates/{days:int}",
             response_model=List[ContactResponse],
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def get_birthday_mates(
         days: int,
-        db: Annotated[Session, Depends(db.get_db)],
+        request: Request,
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)]
 ) -> Any:
     """
@@ -220,46 +548,66 @@ async def get_birthday_mates(
 
     Args:
         days (int): number of days to search for birthday mates
-        db (Session): session object used for database operations
+        request (Request): request checked for If-None-Match
+            and used as the cache key
+        db (AsyncSession): session object used for database operations
         user (User): user retrieved from 'users' with valid credentials,
                also serves as an access filter to user-owned contacts only
 
     Returns:
-        list of ContactResponse objects or JSONResponse with 404 status code
-        if there are no birthday mates in specified number of days
+        list of ContactResponse objects sorted by upcoming birthday or
+        JSONResponse with 404 status code if there are no birthday mates
+        in specified number of days
     """
-    res = []
-    request_md = []
-    for i in range(days):
-        month_day = (date.today()+timedelta(days=i)).strftime("%m-%d")
-        request_md.append(month_day)
-    for md in request_md:
-        part = db.query(ContactORM)\
-            .filter(ContactORM.birthday.like(f"%{md}"),
-                    ContactORM.owner == user.id).all()
-        res.extend(part)
-    if len(res) == 0:
-        return JSONResponse(
-            status_code=404,
-            content={
-                "details": [
-                    {
-                        "msg": f"There is no Birthday mates in {days} day(s)"
-                    }
-                ]
-            }
-        )
-    return [ContactResponse.from_orm(_) for _ in res]
+    today = date.today()
+
+    async def render() -> Response:
+        first_md = month_day(today)
+        last_md = month_day(today + timedelta(days=max(days, 1) - 1))
+        if days >= 366:
+            in_window = ContactORM.birthday_md.is_not(None)
+        elif first_md <= last_md:
+            in_window = ContactORM.birthday_md.between(first_md, last_md)
+        else:
+            # the window wraps past Dec 31
+            in_window = or_(ContactORM.birthday_md >= first_md,
+                            ContactORM.birthday_md <= last_md)
+
+        res = []
+        if days > 0:
+            res = (await db.execute(
+                select(*RESPONSE_COLUMNS)
+                .filter(ContactORM.owner == user.id, in_window)
+                .order_by(case((ContactORM.birthday_md >= first_md, 0),
+                               else_=1),
+                          ContactORM.birthday_md)
+            )).all()
+        if len(res) == 0:
+            return JSONResponse(
+                status_code=404,
+                content={
+                    "details": [
+                        {
+                            "msg": f"There is no Birthday mates in {days} day(s)"
+                        }
+                    ]
+                }
+            )
+        return ContactsJSONResponse(res)
+
+    # the window moves with the date, so is part of the key
+    return await cached_response(request, user.id, render,
+                                 today.isoformat())
 
   
 @router.put("/{contact_id:int}/add/{field:str}/{value}",
             response_model=ContactResponse,
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def add_data(
         contact_id: int,
         field: ContactFields,
         value: str,
-        db: Annotated[Session, Depends(db.get_db)],
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)]
 ) -> Any:
     """
@@ -271,7 +619,7 @@ async def add_data(
        value (str): value to search in field
        user (User): user retrieved from 'users' with valid credentials,
            also serves as an access filter to user-owned contacts only
-       db (Session): session object used for database operations
+       db (AsyncSession): session object used for database operations
 
    Returns:
        JSONResponse`s with status codes:
@@ -279,21 +627,16 @@ async def add_data(
        404 - if user-owned contact with specified id is not found
        422 - for unprocessable data
     """
-    contact = db.query(ContactORM.id == contact_id,
-                       ContactORM.owner == user.id).first()
-
-    if contact is None:
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={
-                "details": [
-                    {"type": "ValueError"},
-                    {"msg": f"Contact with id {contact_id} not found"}
-                ]
-            }
-        )
-
-    if contact.__dict__.get(field) is not None:
+    try:
+        values = field_values(field, value)
+    except ValueError:
+        return invalid_value(field, value)
+    if await update_contact(db, contact_id, user.id, values,
+                            getattr(ContactORM, field).is_(None)) is None:
+        # the write is a single statement; telling why it matched nothing
+        # costs a lookup on this path only
+        if not await contact_exists(db, contact_id, user.id):
+            return contact_not_found(contact_id)
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content={
@@ -304,8 +647,6 @@ async def add_data(
                              " to update it.")}
                 ]
             })
-    db.query(ContactORM).filter_by(id=contact_id).update({field: value})
-    db.commit()
     return JSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
@@ -319,12 +660,12 @@ async def add_data(
 
 @router.patch("/{contact_id:int}/edit/{field:str}/{value:str}",
               response_model=ContactResponse,
-              dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+              dependencies=[Depends(rate_limit)])
 async def edit_data(
         contact_id: int,
         field: ContactFields,
         value: str,
-        db: Annotated[Session, Depends(db.get_db)],
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)]
 ) -> Any:
     """
@@ -336,7 +677,7 @@ async def edit_data(
         value (str): value to search in field
         user (User): user retrieved from 'users' with valid credentials,
            also serves as an access filter to user-owned contacts only
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
 
    Returns:
        JSONResponse`s with status codes:
@@ -344,21 +685,14 @@ async def edit_data(
        404 - if user-owned contact with specified id is not found
        422 - for unprocessable data
     """
-    contact = db.query(ContactORM.id == contact_id,
-                       ContactORM.owner == user.id).first()
-
-    if contact is None:
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={
-                "details": [
-                    {"type": "ValueError"},
-                    {"msg": f"Contact with id {contact_id} not found"}
-                ]
-            }
-        )
-
-    if contact.__dict__.get(field) is None:
+    try:
+        values = field_values(field, value)
+    except ValueError:
+        return invalid_value(field, value)
+    if await update_contact(db, contact_id, user.id, values,
+                            getattr(ContactORM, field).is_not(None)) is None:
+        if not await contact_exists(db, contact_id, user.id):
+            return contact_not_found(contact_id)
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             content={
@@ -369,18 +703,6 @@ async def edit_data(
                              " to add it.")}
                 ]
             })
-    if field == ("full_name"):
-        try:
-            first, last = value.split(" ", maxsplit=1)
-        except:
-            first = value
-            last = None
-        db.query(ContactORM).filter_by(id=contact_id).update({"first_name": first,
-                                                              "last_name": last})
-        db.commit()
-    else:
-        db.query(ContactORM).filter_by(id=contact_id).update({field: value})
-        db.commit()
     return JSONResponse(
         status_code=status.HTTP_201_CREATED,
         content={
@@ -394,10 +716,10 @@ async def edit_data(
 
 @router.delete('/delete/{contact_id:int}',
                responses={204: {"model": None}},
-               dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+               dependencies=[Depends(rate_limit)])
 async def delete(
         contact_id: int,
-        db: Annotated[Session, Depends(db.get_db)],
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)]
 ) -> Any:
     """
@@ -407,15 +729,16 @@ async def delete(
         contact_id (int): identifier of contact in database
         user (User): user retrieved from 'users' with valid credentials,
            also serves as an access filter to user-owned contacts only
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
 
    Returns:
        JSONResponse`s with status codes:
        204 - on success
        404 - if user-owned contact with specified id is not found
     """
-    contact = db.query(ContactORM.id == contact_id,
-                       ContactORM.owner == user.id).first()
+    contact = await db.scalar(select(ContactORM)
+                              .filter(ContactORM.id == contact_id,
+                                      ContactORM.owner == user.id))
     if contact is None:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -426,18 +749,19 @@ async def delete(
                 ]
             }
         )
-    db.delete(contact)
-    db.commit()
+    await db.delete(contact)
+    await db.commit()
+    await contact_versions.bump(user.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.delete('/{contact_id:int}/delete/{field:str}',
                responses={204: {"model": None}},
-               dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+               dependencies=[Depends(rate_limit)])
 async def delete_data(
         contact_id: int,
         field: ContactFields,
-        db: Annotated[Session, Depends(db.get_db)],
+        db: Annotated[AsyncSession, Depends(db.get_db)],
         user: Annotated[User, Depends(auth_service.get_access_user)]
 ) -> Any:
     """
@@ -448,7 +772,7 @@ async def delete_data(
         field (ContactFields): field to search in contacts
         user (User): user retrieved from 'users' with valid credentials,
            also serves as an access filter to user-owned contacts only
-        db (Session): session object used for database operations
+        db (AsyncSession): session object used for database operations
 
    Returns:
        JSONResponse`s with status codes:
@@ -456,18 +780,6 @@ async def delete_data(
        404 - if user-owned contact with specified id is not found
        422 - for unprocessable data
     """
-    contact = db.query(ContactORM.id == contact_id,
-                       ContactORM.owner == user.id).first()
-    if contact is None:
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={
-                "details": [
-                    {"type": "ValueError"},
-                    {"msg": f"Contact with id {contact_id} not found"}
-                ]
-            }
-        )
     if field == "full_name" or field == "first_name":
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -479,6 +791,7 @@ async def delete_data(
                 ]
             }
         )
-    db.query(ContactORM).filter_by(id=contact_id).update({field: None})
-    db.commit()
+    if await update_contact(db, contact_id, user.id,
+                            field_values(field, None)) is None:
+        return contact_not_found(contact_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
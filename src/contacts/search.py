@@ -0,0 +1,77 @@
+from typing import Sequence
+
+from sqlalchemy import (Row, Select, select, func, or_, literal_column,
+                        String, cast, table, column)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from contacts.orms import ContactORM, SEARCH_FIELDS
+from contacts.responses import RESPONSE_COLUMNS
+
+# FTS5 trigram tokenizer does not index anything shorter than a trigram
+FTS_MIN_LENGTH = 3
+
+contacts_fts = table("contacts_fts", column("rowid"), column("rank"))
+
+
+def escape_like(value: str) -> str:
+    return (value.replace("\\", "\\\\")
+            .replace("%", "\\%")
+            .replace("_", "\\_"))
+
+
+def like_query(owner: int, field: str, value: str) -> Select:
+    """Unindexed substring match, for fields without a search index."""
+    searched = getattr(ContactORM, field)
+    if field == "birthday":
+        searched = cast(searched, String)
+    return select(ContactORM)\
+        .filter(ContactORM.owner == owner,
+                searched.ilike(f"%{escape_like(value)}%", escape="\\"))\
+        .order_by(ContactORM.id)
+
+
+def trigram_query(owner: int, field: str, value: str) -> Select:
+    """Postgres: substring or fuzzy match through the pg_trgm GIN index."""
+    searched = getattr(ContactORM, field)
+    return select(ContactORM)\
+        .filter(ContactORM.owner == owner,
+                or_(searched.ilike(f"%{escape_like(value)}%", escape="\\"),
+                    searched.op("%")(value)))\
+        .order_by(func.similarity(searched, value).desc(), ContactORM.id)
+
+
+def fts_query(owner: int, field: str, value: str) -> Select:
+    """SQLite: substring match through the contacts_fts trigram table."""
+    phrase = value.replace('"', '""')
+    return select(ContactORM)\
+        .join(contacts_fts, contacts_fts.c.rowid == ContactORM.id)\
+        .filter(literal_column("contacts_fts")
+                .op("MATCH")(f'{field} : "{phrase}"'),
+                ContactORM.owner == owner)\
+        .order_by(contacts_fts.c.rank, ContactORM.id)
+
+
+def search_query(dialect: str, owner: int, field: str, value: str) -> Select:
+    if field in SEARCH_FIELDS:
+        if dialect == "postgresql":
+            return trigram_query(owner, field, value)
+        if dialect == "sqlite" and len(value) >= FTS_MIN_LENGTH:
+            return fts_query(owner, field, value)
+    return like_query(owner, field, value)
+
+
+async def search_contacts(
+        db: AsyncSession,
+        owner: int,
+        field: str,
+        value: str,
+        limit: int,
+        offset: int = 0
+) -> Sequence[Row]:
+    """
+    Return one page of owner's contacts matching value, best match first,
+    as rows of RESPONSE_COLUMNS.
+    """
+    query = search_query(db.bind.dialect.name, owner, field, value)\
+        .with_only_columns(*RESPONSE_COLUMNS)
+    return (await db.execute(query.limit(limit).offset(offset))).all()
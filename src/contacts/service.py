@@ -0,0 +1,120 @@
+from collections import defaultdict
+from typing import Any, Optional, Sequence
+
+from fastapi import status
+from sqlalchemy import Row, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from contacts.orms import ContactORM, month_day
+from contacts.models import Contact, ContactPatch, PatchResult
+
+DIALECT_INSERTS = {"postgresql": postgresql.insert,
+                   "sqlite": sqlite.insert}
+
+
+async def insert_contacts(
+        db: AsyncSession,
+        owner: int,
+        contacts: Sequence[Contact]
+) -> list[Optional[Row]]:
+    """
+    Insert contacts with one multi-row INSERT ... RETURNING.
+
+    Rows that clash with a unique full_name or email are skipped by
+    ON CONFLICT DO NOTHING instead of failing the whole statement.
+
+    Returns:
+        stored rows aligned with contacts, None for every skipped row
+    """
+    if not contacts:
+        return []
+    dialect = db.bind.dialect.name
+    contacts_table = ContactORM.__table__
+    stmt = DIALECT_INSERTS.get(dialect, insert)(contacts_table).values([
+        {**contact.model_dump(exclude={"full_name"}), "owner": owner}
+        for contact in contacts
+    ])
+    if dialect in DIALECT_INSERTS:
+        stmt = stmt.on_conflict_do_nothing()
+    result = await db.execute(stmt.returning(*contacts_table.c))
+    inserted = {row.full_name: row for row in result}
+    # full_name is unique, so it ties a returned row to its input; pop
+    # leaves later duplicates of the same name reported as skipped
+    return [inserted.pop(contact.full_name, None) for contact in contacts]
+
+
+async def update_batch(db: AsyncSession,
+                       owner: int,
+                       rows: list[dict[str, Any]]) -> None:
+    """Bulk UPDATE by primary key: one executemany for rows of one shape."""
+    async with db.begin_nested():
+        await db.execute(update(ContactORM)
+                         .where(ContactORM.owner == owner)
+                         .execution_options(synchronize_session=None), rows)
+
+
+async def patch_contacts(
+        db: AsyncSession,
+        owner: int,
+        patches: Sequence[ContactPatch]
+) -> list[PatchResult]:
+    """
+    Apply partial updates to owner's contacts in one transaction.
+
+    Patches are grouped by the set of fields they change and every group
+    is written by a single batched UPDATE in its own savepoint. A group
+    that breaks a unique constraint is retried row by row, so only the
+    conflicting contacts fail.
+
+    Returns:
+        results aligned with patches
+    """
+    results: list[Optional[PatchResult]] = [None] * len(patches)
+    existing = set(await db.scalars(
+        select(ContactORM.id)
+        .filter(ContactORM.owner == owner,
+                ContactORM.id.in_({patch.id for patch in patches}))
+    ))
+
+    shapes: dict[frozenset, list[tuple[int, dict]]] = defaultdict(list)
+    seen = set()
+    for index, patch in enumerate(patches):
+        values = patch.model_dump(exclude_unset=True)
+        if patch.id not in existing:
+            results[index] = PatchResult(
+                id=patch.id, status=status.HTTP_404_NOT_FOUND,
+                msg=f"Contact with id {patch.id} not found")
+        elif patch.id in seen:
+            results[index] = PatchResult(
+                id=patch.id, status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                msg="Contact is patched more than once")
+        elif len(values) == 1:
+            results[index] = PatchResult(
+                id=patch.id, status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                msg="Nothing to update")
+        else:
+            if "birthday" in values:
+                values["birthday_md"] = month_day(values["birthday"])
+            shapes[frozenset(values)].append((index, values))
+        seen.add(patch.id)
+
+    for rows in shapes.values():
+        try:
+            await update_batch(db, owner, [values for _, values in rows])
+            failed = []
+        except IntegrityError:
+            failed = rows
+        for index, values in rows:
+            results[index] = PatchResult(id=values["id"],
+                                         status=status.HTTP_200_OK)
+        for index, values in failed:
+            try:
+                await update_batch(db, owner, [values])
+            except IntegrityError:
+                results[index] = PatchResult(
+                    id=values["id"], status=status.HTTP_409_CONFLICT,
+                    msg="Contact with such fullname or email already exists")
+    await db.commit()
+    return results
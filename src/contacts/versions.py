@@ -0,0 +1,81 @@
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from fastapi import Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+class ContactVersions:
+    """
+    Per-owner version of the contacts data, kept in Redis.
+
+    Every write to an owner's contacts bumps the version, so a version
+    together with the request URL identifies one representation and can
+    serve as a strong ETag. A missing counter starts from the current
+    time instead of zero, so tags issued before Redis lost the key are
+    never reused. Without Redis there is no version and no ETag.
+    """
+    redis: Optional[Redis] = None
+    prefix = "contacts:version:"
+
+    @classmethod
+    def init(cls, redis: Redis) -> None:
+        cls.redis = redis
+
+    async def get(self, owner: int) -> Optional[int]:
+        if self.redis is None:
+            return None
+        key = f"{self.prefix}{owner}"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.get(key)
+                _, version = await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"contacts version read failed: {e}")
+            return None
+        return int(version)
+
+    async def bump(self, owner: int) -> None:
+        if self.redis is None:
+            return
+        key = f"{self.prefix}{owner}"
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, time.time_ns(), nx=True)
+                pipe.incr(key)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"contacts version bump failed: {e}")
+
+
+def request_digest(owner: int, request: Request, *vary: str) -> str:
+    """Digest of the owner's view of request.url, query order aside."""
+    query = "&".join(sorted(request.url.query.split("&")))
+    return hashlib.blake2b(
+        ":".join((str(owner), f"{request.url.path}?{query}", *vary)).encode(),
+        digest_size=8
+    ).hexdigest()
+
+
+def make_etag(version: int, digest: str) -> str:
+    return f'"{version:x}-{digest}"'
+
+
+def not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Whether If-None-Match already names etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if etag is None or header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/")
+                    for tag in header.split(","))
+
+
+contact_versions = ContactVersions()
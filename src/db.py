@@ -1,26 +1,57 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator
 
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import make_url, URL
+from sqlalchemy.ext.asyncio import (create_async_engine,
+                                    async_sessionmaker,
+                                    AsyncSession)
+from sqlalchemy.orm import DeclarativeBase
 
+from monitoring.pool import InstrumentedPool, pool_stats
+from monitoring.queries import instrument_engine
 from settings import settings
 
-# engine = create_engine("sqlite:///hw12_api.sqlite")
-engine = create_engine(settings.sqlalchemy_url)
-DBSession = sessionmaker(autocommit=False,
-                         autoflush=False,
-                         bind=engine)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str | URL) -> URL:
+    """Return the url with its sync driver swapped for the async one."""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername,
+                                                url.drivername))
+
+
+# engine = create_async_engine("sqlite+aiosqlite:///hw12_api.sqlite")
+engine = create_async_engine(async_url(settings.sqlalchemy_url),
+                             poolclass=InstrumentedPool,
+                             pool_size=settings.db_pool_size,
+                             max_overflow=settings.db_max_overflow,
+                             pool_timeout=settings.db_pool_timeout,
+                             pool_recycle=settings.db_pool_recycle,
+                             pool_pre_ping=settings.db_pool_pre_ping)
+pool_stats.attach(engine)
+instrument_engine(engine)
+DBSession = async_sessionmaker(autoflush=False,
+                               expire_on_commit=False,
+                               bind=engine)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async def get_db():
-    db = DBSession()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with DBSession() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work that outlives the request, like streaming."""
+    return DBSession
 
 
 if __name__ == "__main__":
@@ -0,0 +1,298 @@
+"""
+Deterministic generator of users and contacts for benchmarks.
+
+Rows are generated in chunks of --chunk contacts; a chunk depends only on
+--seed and its index, and ids are assigned from the row number, so the
+same arguments always produce the same database whatever the number of
+--workers. Worker processes generate the chunks and, on PostgreSQL, load
+them in parallel with COPY; other databases get batched multi-row
+INSERTs from the main process.
+
+Usage (from src/, with the app environment loaded):
+    python db_filler.py --reset --users 1000 --contacts 2000000 \\
+        --owner-skew 1.1 --workers 8
+    python db_filler.py --url sqlite:///bench.sqlite --reset --contacts 100000
+"""
+import argparse
+import calendar
+import csv
+import io
+import json
+import os
+import random
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import create_engine, func, insert, select, text, URL
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import NullPool
+
+from auth.hashing import make_password_hash
+from contacts.orms import ContactORM, month_day
+from db import Base
+from settings import settings
+from users.orms import User
+
+FIRST_NAMES = ("Olena", "Taras", "Iryna", "Andrii", "Oksana", "Dmytro",
+               "Nataliia", "Serhii", "Mariia", "Bohdan", "Sofiia", "Yurii",
+               "Kateryna", "Oleksandr", "Viktoriia", "Mykola", "Anna",
+               "Volodymyr", "Yuliia", "Petro", "Halyna", "Ivan", "Liudmyla",
+               "Roman", "Tetiana", "Vasyl", "Khrystyna", "Ostap")
+LAST_NAMES = ("Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko",
+              "Kravchenko", "Oliinyk", "Lysenko", "Melnyk", "Boiko",
+              "Moroz", "Marchenko", "Savchenko", "Rudenko", "Pavlenko",
+              "Petrenko", "Klymenko", "Levchenko", "Koval", "Hrytsenko",
+              "Ponomarenko", "Tkachuk", "Kozak", "Polishchuk", "Vovk")
+DOMAINS = ("ukr.net", "gmail.com", "i.ua", "meta.ua", "outlook.com")
+WORDS = ("met", "at", "conference", "work", "school", "neighbour", "call",
+         "after", "lunch", "friend", "of", "family", "gym", "project",
+         "client", "old", "university", "trip", "birthday", "gift")
+
+CONTACT_COLUMNS = ("id", "first_name", "last_name", "phone", "email",
+                   "birthday", "birthday_md", "extra", "owner")
+USER_PASSWORD = "password"
+
+
+class FillConfig:
+    """Generation parameters, passed to the worker processes."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.seed = args.seed
+        self.users = args.users
+        self.contacts = args.contacts
+        self.chunk = args.chunk
+        self.null_email = args.null_email
+        self.null_phone = args.null_phone
+        self.null_birthday = args.null_birthday
+        self.extra_ratio = args.extra_ratio
+        self.age_min = args.age_min
+        self.age_max = args.age_max
+        self.birthday_window = args.birthday_window
+        self.birthday_skew = args.birthday_skew
+        self.reference = date.fromisoformat(args.reference_date)
+        # cumulative Zipf weights of the owners, 0 is uniform
+        self.owner_weights = list(accumulate(
+            1 / (rank + 1) ** args.owner_skew for rank in range(args.users)))
+
+    @property
+    def chunks(self) -> int:
+        return -(-self.contacts // self.chunk)
+
+
+def pick_owner(config: FillConfig, rnd: random.Random) -> int:
+    weights = config.owner_weights
+    return bisect_left(weights, rnd.random() * weights[-1]) + 1
+
+
+def pick_birthday(config: FillConfig, rnd: random.Random) -> date:
+    year = config.reference.year - rnd.randint(config.age_min,
+                                               config.age_max)
+    if config.birthday_window and rnd.random() < config.birthday_skew:
+        # 2000 is a leap year, so the window may start on Feb 29
+        start = date(2000, *config.birthday_window)
+        day_of_year = start + timedelta(days=rnd.randrange(7))
+    else:
+        day_of_year = date(2001, 1, 1) + timedelta(days=rnd.randrange(365))
+    if (day_of_year.month, day_of_year.day) == (2, 29) \
+            and not calendar.isleap(year):
+        return date(year, 3, 1)
+    return day_of_year.replace(year=year)
+
+
+def generate_chunk(config: FillConfig, index: int) -> list[tuple]:
+    """
+    Contacts of chunk index as tuples in CONTACT_COLUMNS order.
+
+    Args:
+        config (FillConfig): generation parameters
+        index (int): chunk number, rows get ids from index * config.chunk
+
+    Returns:
+        the rows; full_name is generated by the database, the row number
+        in last_name and email keeps both unique
+    """
+    rnd = random.Random(f"{config.seed}:contacts:{index}")
+    first_id = index * config.chunk + 1
+    last_id = min(first_id + config.chunk, config.contacts + 1)
+    rows = []
+    for row_id in range(first_id, last_id):
+        first_name = rnd.choice(FIRST_NAMES)
+        last_name = f"{rnd.choice(LAST_NAMES)}-{row_id:x}"
+        email = None if rnd.random() < config.null_email else \
+            f"{first_name}.{last_name}@{rnd.choice(DOMAINS)}".lower()
+        phone = None if rnd.random() < config.null_phone else \
+            f"380{rnd.choice((50, 63, 66, 67, 68, 73, 93, 95, 96, 97, 98))}" \
+            f"{rnd.randrange(10 ** 7):07d}"
+        birthday = None if rnd.random() < config.null_birthday else \
+            pick_birthday(config, rnd)
+        extra = " ".join(rnd.choices(WORDS, k=rnd.randint(2, 12))) \
+            if rnd.random() < config.extra_ratio else None
+        rows.append((row_id, first_name, last_name, phone, email, birthday,
+                     month_day(birthday), extra, pick_owner(config, rnd)))
+    return rows
+
+
+def copy_chunk(url: str, config: FillConfig, index: int) -> int:
+    """Generate chunk index and COPY it into PostgreSQL."""
+    rows = generate_chunk(config, index)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    engine = create_engine(url, poolclass=NullPool)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY contacts ({', '.join(CONTACT_COLUMNS)})"
+                               f" FROM STDIN WITH (FORMAT csv)", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+        engine.dispose()
+    return len(rows)
+
+
+def sync_url(url: str) -> URL:
+    """Return url with an async driver swapped for its sync one."""
+    url = make_url(url)
+    return url.set(drivername={"postgresql+asyncpg": "postgresql+psycopg2",
+                               "sqlite+aiosqlite": "sqlite"}
+                   .get(url.drivername, url.drivername))
+
+
+def prepare(engine: Engine, reset: bool) -> None:
+    with engine.begin() as conn:
+        if reset:
+            Base.metadata.drop_all(conn)
+        Base.metadata.create_all(conn)
+        if conn.scalar(select(func.count()).select_from(User)) \
+                or conn.scalar(select(func.count()).select_from(ContactORM)):
+            raise SystemExit("the target database is not empty, "
+                             "pass --reset to drop its tables")
+
+
+def fill_users(engine: Engine, config: FillConfig) -> None:
+    hashed = make_password_hash(USER_PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": n, "email": f"user{n}@{DOMAINS[n % len(DOMAINS)]}",
+             "hashed_pwd": hashed, "email_confirmed": True}
+            for n in range(1, config.users + 1)])
+
+
+def fill_contacts(engine: Engine, config: FillConfig, method: str,
+                  workers: int, batch: int) -> Iterator[int]:
+    """Load all chunks, yielding the number of rows of each."""
+    url = engine.url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if method == "copy":
+            yield from pool.map(copy_chunk, [url] * config.chunks,
+                                [config] * config.chunks,
+                                range(config.chunks))
+            return
+        table = ContactORM.__table__
+        chunks = pool.map(generate_chunk, [config] * config.chunks,
+                          range(config.chunks))
+        for rows in chunks:
+            with engine.begin() as conn:
+                for start in range(0, len(rows), batch):
+                    conn.execute(insert(table), [
+                        dict(zip(CONTACT_COLUMNS, row))
+                        for row in rows[start:start + batch]])
+            yield len(rows)
+
+
+def finish(engine: Engine) -> None:
+    """Move the id sequences past the explicit ids."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for table in ("users", "contacts"):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce(max(id), 1)) FROM {table}"))
+        conn.execute(text("ANALYZE contacts"))
+
+
+def main(args: argparse.Namespace) -> dict[str, Any]:
+    config = FillConfig(args)
+    engine = create_engine(sync_url(args.url))
+    method = args.method or ("copy" if engine.dialect.name == "postgresql"
+                             else "insert")
+    if method == "copy" and engine.dialect.name != "postgresql":
+        raise SystemExit("--method copy needs a PostgreSQL target")
+
+    started = time.perf_counter()
+    prepare(engine, args.reset)
+    fill_users(engine, config)
+    loaded = 0
+    for rows in fill_contacts(engine, config, method, args.workers,
+                              args.batch):
+        loaded += rows
+        if args.progress:
+            print(f"{loaded}/{config.contacts}", flush=True)
+    finish(engine)
+    engine.dispose()
+    elapsed = time.perf_counter() - started
+    return {"database": engine.dialect.name,
+            "method": method,
+            "seed": config.seed,
+            "users": config.users,
+            "contacts": loaded,
+            "seconds": round(elapsed, 2),
+            "contacts_per_second": round(loaded / elapsed)}
+
+
+def window_start(value: str) -> tuple[int, int]:
+    """--birthday-window as (month, day), any day of a leap year is valid"""
+    try:
+        month, day = map(int, value.split("-"))
+        date(2000, month, day)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an MM-DD date: {value!r}")
+    return month, day
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=settings.sqlalchemy_url,
+                        help="target database, SQLALCHEMY_URL by default")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop and recreate the app tables first")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--owner-skew", type=float, default=1.0,
+                        help="Zipf exponent of contacts per owner, "
+                             "0 spreads them evenly")
+    parser.add_argument("--null-email", type=float, default=0.3)
+    parser.add_argument("--null-phone", type=float, default=0.2)
+    parser.add_argument("--null-birthday", type=float, default=0.4)
+    parser.add_argument("--extra-ratio", type=float, default=0.2,
+                        help="share of contacts with an extra note")
+    parser.add_argument("--age-min", type=int, default=16)
+    parser.add_argument("--age-max", type=int, default=80)
+    parser.add_argument("--birthday-window", type=window_start,
+                        metavar="MM-DD",
+                        help="start of a week that gets --birthday-skew "
+                             "of the birthdays")
+    parser.add_argument("--birthday-skew", type=float, default=0.0)
+    parser.add_argument("--reference-date", default="2024-01-01",
+                        help="ages are counted back from this date")
+    parser.add_argument("--chunk", type=int, default=50_000,
+                        help="contacts generated per worker task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--method", choices=("copy", "insert"),
+                        help="COPY on PostgreSQL, INSERT elsewhere "
+                             "by default")
+    parser.add_argument("--batch", type=int, default=5000,
+                        help="rows per executemany batch of INSERTs")
+    parser.add_argument("--progress", action="store_true")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    print(json.dumps(main(parse_args()), indent=2))
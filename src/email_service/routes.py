@@ -4,19 +4,21 @@ from datetime import timedelta
 
 from fastapi import BackgroundTasks, Depends
 from fastapi.routing import APIRouter
-from fastapi_limiter.depends import RateLimiter
 from pydantic import EmailStr, BaseModel
 from fastapi_mail import (ConnectionConfig,
                           MessageSchema,
                           MessageType,
                           FastMail)
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from starlette.responses import JSONResponse
 
 from users.orms import User
+from users.models import UserAuth
 from settings import settings
 from auth.service import Authentication
+from ratelimit.limiter import rate_limit
 from db import get_db
 
 auth_service = Authentication()
@@ -45,13 +47,15 @@ conf = ConnectionConfig(
 
 
 @router.post('/send-confirmation',
-             dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+             dependencies=[Depends(rate_limit)])
 async def send_confirmation(
         bg_task: BackgroundTasks,
         email: EmailModel,
-        db: Annotated[Session, Depends(get_db)]
+        db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Any:
-    user_db: User = db.query(User).filter(User.email == email.email).first()
+    user_db: User = await db.scalar(
+        select(User).filter(User.email == email.email)
+    )
     if not user_db:
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -79,13 +83,15 @@ async def send_confirmation(
 
 
 @router.get('/confirm/{token:str}',
-            dependencies=[Depends(RateLimiter(times=2, seconds=10))])
+            dependencies=[Depends(rate_limit)])
 async def confirm_email(
-        db: Annotated[Session, Depends(get_db)],
+        db: Annotated[AsyncSession, Depends(get_db)],
         token: str
 ) -> Any:
-    user: User = auth_service.get_access_user(token=token,
-                                              db=db)
+    # confirmation tokens are not bound to a login session
+    user: UserAuth = await auth_service.get_user(token=token,
+                                                 db=db,
+                                                 check_session=False)
     if user.email_confirmed:
         return JSONResponse(
             status_code=status.HTTP_409_CONFLICT,
@@ -94,8 +100,10 @@ async def confirm_email(
             }
         )
 
-    user.email_confirmed = True
-    db.commit()
+    await db.execute(update(User).filter_by(id=user.id)
+                     .values(email_confirmed=True))
+    await db.commit()
+    await auth_service.USER_CACHE.invalidate(user.email)
     return JSONResponse(
         status_code=200,
         content={
@@ -4,34 +4,42 @@ import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-import redis.asyncio as redis
-from fastapi_limiter import FastAPILimiter
-
 from contacts.routes import router as contact_router
 from auth.routes import router as auth_router
 from email_service.routes import router as email_router
 from users.routes import router as users_router
-from settings import settings
+from monitoring.routes import router as monitoring_router
+from monitoring.middleware import MetricsMiddleware
+from auth.hashing import password_hasher
+from auth.cache import UserCache
+from auth.sessions import SessionStore
+from ratelimit.limiter import HybridLimiter, limiter
+from contacts.versions import ContactVersions
+from contacts.cache import ContactCache
+from redis_pool import close_redis, redis
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    r = await redis.Redis(host=settings.redis_server,
-                          port=settings.redis_port,
-                          # password=settings.redis_pass,
-                          db=0,
-                          decode_responses=True,
-                          encoding='utf-8')
-    await FastAPILimiter.init(r)
+    # everything that talks to Redis shares the one pool of redis_pool
+    for component in (HybridLimiter, UserCache, SessionStore,
+                      ContactVersions, ContactCache):
+        component.init(redis)
 
     yield
 
+    # pending rate limiter hits go out before the pool is drained
+    await limiter.close()
+    await close_redis()
+    password_hasher.shutdown()
+
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(contact_router)
 app.include_router(auth_router)
 app.include_router(email_router)
 app.include_router(users_router)
+app.include_router(monitoring_router)
 
 
 origins = [
@@ -48,6 +56,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+"""birthday month-day for contacts
+
+Revision ID: 5e0b7a3c9d21
+Revises: cc38d19b2fab
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7a3c9d21'
+down_revision: Union[str, None] = 'cc38d19b2fab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('birthday_md', sa.SmallInteger(), nullable=True))
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE contacts "
+                   "SET birthday_md = CAST(strftime('%m%d', birthday) AS INTEGER) "
+                   "WHERE birthday IS NOT NULL")
+    else:
+        op.execute("UPDATE contacts "
+                   "SET birthday_md = EXTRACT(MONTH FROM birthday) * 100 "
+                   "+ EXTRACT(DAY FROM birthday) "
+                   "WHERE birthday IS NOT NULL")
+    op.create_index('ix_contacts_owner_birthday_md', 'contacts', ['owner', 'birthday_md'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contacts_owner_birthday_md', table_name='contacts')
+    op.drop_column('contacts', 'birthday_md')
@@ -0,0 +1,66 @@
+"""contacts search indexes
+
+Revision ID: a41f6c2e8b07
+Revises: 5e0b7a3c9d21
+Create Date: 2026-10-18 11:40:07.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6c2e8b07'
+down_revision: Union[str, None] = '5e0b7a3c9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_FIELDS = ('full_name', 'email', 'phone')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("""CREATE VIRTUAL TABLE contacts_fts
+            USING fts5(full_name, email, phone,
+                       content='contacts', content_rowid='id',
+                       tokenize='trigram')""")
+        op.execute("""CREATE TRIGGER contacts_fts_ai
+            AFTER INSERT ON contacts BEGIN
+                INSERT INTO contacts_fts(rowid, full_name, email, phone)
+                VALUES (new.id, new.full_name, new.email, new.phone);
+            END""")
+        op.execute("""CREATE TRIGGER contacts_fts_ad
+            AFTER DELETE ON contacts BEGIN
+                INSERT INTO contacts_fts(contacts_fts, rowid,
+                                         full_name, email, phone)
+                VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+            END""")
+        op.execute("""CREATE TRIGGER contacts_fts_au
+            AFTER UPDATE ON contacts BEGIN
+                INSERT INTO contacts_fts(contacts_fts, rowid,
+                                         full_name, email, phone)
+                VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+                INSERT INTO contacts_fts(rowid, full_name, email, phone)
+                VALUES (new.id, new.full_name, new.email, new.phone);
+            END""")
+        op.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in SEARCH_FIELDS:
+        op.create_index(f'ix_contacts_{field}_trgm', 'contacts', [field], unique=False,
+                        postgresql_using='gin',
+                        postgresql_ops={field: 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('contacts_fts_ai', 'contacts_fts_ad', 'contacts_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS contacts_fts")
+        return
+
+    for field in SEARCH_FIELDS:
+        op.drop_index(f'ix_contacts_{field}_trgm', table_name='contacts')
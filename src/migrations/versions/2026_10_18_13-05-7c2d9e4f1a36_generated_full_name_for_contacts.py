@@ -0,0 +1,77 @@
+"""generated full_name for contacts
+
+Revision ID: 7c2d9e4f1a36
+Revises: a41f6c2e8b07
+Create Date: 2026-10-18 13:05:22.631940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d9e4f1a36'
+down_revision: Union[str, None] = 'a41f6c2e8b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FULL_NAME_SQL = "first_name || coalesce(' ' || nullif(last_name, ''), '')"
+
+# the table is recreated on SQLite, which drops the FTS triggers with it
+FTS_TRIGGERS = (
+    """CREATE TRIGGER contacts_fts_ai
+        AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts(rowid, full_name, email, phone)
+            VALUES (new.id, new.full_name, new.email, new.phone);
+        END""",
+    """CREATE TRIGGER contacts_fts_ad
+        AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid,
+                                     full_name, email, phone)
+            VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+        END""",
+    """CREATE TRIGGER contacts_fts_au
+        AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid,
+                                     full_name, email, phone)
+            VALUES ('delete', old.id, old.full_name, old.email, old.phone);
+            INSERT INTO contacts_fts(rowid, full_name, email, phone)
+            VALUES (new.id, new.full_name, new.email, new.phone);
+        END""",
+)
+
+
+def replace_full_name(column: sa.Column) -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite can neither drop a UNIQUE column nor add a STORED one;
+        # the copied table keeps the reflected UNIQUE (full_name)
+        with op.batch_alter_table('contacts', recreate='always') as batch_op:
+            batch_op.drop_column('full_name')
+            batch_op.add_column(column)
+        for trigger in FTS_TRIGGERS:
+            op.execute(trigger)
+        op.execute("INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')")
+        return
+
+    # dropping the column drops its unique constraint and trigram index too
+    op.drop_column('contacts', 'full_name')
+    op.add_column('contacts', column)
+    op.create_unique_constraint('contacts_full_name_key', 'contacts',
+                                ['full_name'])
+    op.create_index('ix_contacts_full_name_trgm', 'contacts', ['full_name'],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'full_name': 'gin_trgm_ops'})
+
+
+def upgrade() -> None:
+    replace_full_name(sa.Column('full_name', sa.String(),
+                                sa.Computed(FULL_NAME_SQL, persisted=True),
+                                nullable=True))
+
+
+def downgrade() -> None:
+    replace_full_name(sa.Column('full_name', sa.String(), nullable=True))
+    op.execute(f"UPDATE contacts SET full_name = {FULL_NAME_SQL}")
@@ -0,0 +1,50 @@
+"""contacts owner indexes
+
+Revision ID: 3b8e51d0c6f4
+Revises: 7c2d9e4f1a36
+Create Date: 2026-10-18 14:20:51.093472
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e51d0c6f4'
+down_revision: Union[str, None] = '7c2d9e4f1a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_contacts_owner_id': ['owner', 'id'],
+    'ix_contacts_owner_full_name': ['owner', 'full_name'],
+    'ix_contacts_owner_email': ['owner', 'email'],
+    'ix_contacts_owner_phone': ['owner', 'phone'],
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY does not lock out writes, but cannot run in a transaction
+        with op.get_context().autocommit_block():
+            for name, columns in INDEXES.items():
+                op.create_index(name, 'contacts', columns, unique=False,
+                                postgresql_concurrently=True)
+        return
+
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'contacts', columns, unique=False)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name in INDEXES:
+                op.drop_index(name, table_name='contacts',
+                              postgresql_concurrently=True)
+        return
+
+    for name in INDEXES:
+        op.drop_index(name, table_name='contacts')
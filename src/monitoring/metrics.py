@@ -0,0 +1,266 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, Optional
+
+from redis.asyncio.connection import Connection
+from starlette.types import Scope
+
+from auth.cache import claims_cache, user_cache
+from contacts.cache import contact_cache
+from monitoring.pool import pool_stats
+from ratelimit.limiter import limiter
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+CALLS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"'
+                          for name, value in zip(names, values)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    """
+    Base of the metric families rendered by Registry.
+
+    Samples are kept per tuple of label values, so the label values must
+    come from a bounded set (route templates, methods, status codes).
+    """
+    kind = "untyped"
+
+    def __init__(self,
+                 name: str,
+                 help: str,
+                 labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def samples(self) -> Iterator[str]:
+        for values, value in self.values.items():
+            yield (f"{self.name}{format_labels(self.labels, values)} "
+                   f"{format_value(value)}")
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.values[values] = self.values.get(values, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.values[values] = self.values.get(values, 0) + amount
+
+    def dec(self, *values: str, amount: float = 1) -> None:
+        self.values[values] = self.values.get(values, 0) - amount
+
+    def set(self, *values: str, value: float) -> None:
+        self.values[values] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 help: str,
+                 labels: tuple[str, ...] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = (*sorted(buckets), float("inf"))
+        # per label values: [bucket counts..., sum, count]
+        self.series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, *values: str, value: float) -> None:
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        labels = (*self.labels, "le")
+        for values, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket = format_labels(labels, (*values, format_value(bound)))
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            label_text = format_labels(self.labels, values)
+            yield f"{self.name}_sum{label_text} {format_value(series[-2])}"
+            yield f"{self.name}_count{label_text} {series[-1]}"
+
+
+class Registry:
+    """
+    Metrics of this process in the Prometheus text exposition format.
+
+    Collectors are called on every render and may refresh gauges from
+    state kept elsewhere, like the connection pool statistics.
+    """
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+        self.collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        for collect in self.collectors:
+            collect()
+        return ("\n".join(line for metric in self.metrics
+                          for line in metric.render()) + "\n").encode()
+
+
+class RequestCalls:
+    """Database statements and Redis round trips made by one request."""
+    __slots__ = ("scope", "queries", "query_time", "redis")
+
+    def __init__(self, scope: Optional[Scope] = None) -> None:
+        self.scope = scope
+        self.queries = 0
+        self.query_time = 0.0
+        self.redis = 0
+
+    @property
+    def route(self) -> str:
+        """Template of the matched route, once the router has set it."""
+        route = self.scope.get("route") if self.scope else None
+        return getattr(route, "path", None) or "unmatched"
+
+
+# set by MetricsMiddleware for the duration of each request
+request_calls: ContextVar[Optional[RequestCalls]] = ContextVar("request_calls",
+                                                               default=None)
+
+
+class CountingConnection(Connection):
+    """
+    Redis connection counting round trips towards the current request,
+    a pipeline is one round trip.
+    """
+
+    async def send_packed_command(self, command, check_health=True) -> None:
+        calls = request_calls.get()
+        if calls is not None:
+            calls.redis += 1
+        await super().send_packed_command(command, check_health)
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status")))
+http_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.",
+    ("method", "route")))
+http_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being served.",
+    ("method",)))
+http_rate_limited = registry.register(Counter(
+    "http_rate_limited_total", "Requests rejected by the rate limiter.",
+    ("route",)))
+request_queries = registry.register(Histogram(
+    "http_request_db_queries", "Database statements per request.",
+    ("route",), CALLS_BUCKETS))
+request_db_time = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in database statements.",
+    ("route",)))
+query_budget_exceeded = registry.register(Counter(
+    "http_query_budget_exceeded_total",
+    "Requests that ran more statements than their query budget.",
+    ("route",)))
+request_redis = registry.register(Histogram(
+    "http_request_redis_calls", "Redis round trips per request.",
+    ("route",), CALLS_BUCKETS))
+db_pool_connections = registry.register(Gauge(
+    "db_pool_connections", "Database pool connections by state.",
+    ("state",)))
+redis_pool_connections = registry.register(Gauge(
+    "redis_pool_connections", "Redis pool connections by state.",
+    ("state",)))
+db_pool_timeouts = registry.register(Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout."))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result.",
+    ("cache", "result")))
+cache_entries = registry.register(Gauge(
+    "cache_entries", "Entries a cache holds in process.",
+    ("cache",)))
+rate_limiter_buckets = registry.register(Gauge(
+    "rate_limiter_buckets", "Token buckets the rate limiter holds."))
+rate_limiter_rejected = registry.register(Counter(
+    "rate_limiter_rejected_total",
+    "Requests rejected by the local token buckets."))
+rate_limiter_syncs = registry.register(Counter(
+    "rate_limiter_syncs_total", "Rate limiter syncs with Redis by result.",
+    ("result",)))
+
+# stats() keys of the caches, as result label values
+CACHE_RESULTS = {"hits": "hit",
+                 "redis_hits": "redis_hit",
+                 "waited_hits": "waited_hit",
+                 "misses": "miss"}
+
+
+def collect_pool() -> None:
+    snapshot = pool_stats.snapshot()
+    for state in ("pool_size", "checked_out", "checked_in", "overflow"):
+        if state in snapshot:
+            db_pool_connections.set(state, value=snapshot[state])
+    db_pool_timeouts.values[()] = snapshot["timeouts"]
+
+
+registry.collectors.append(collect_pool)
+
+
+def collect_caches() -> None:
+    for cache, stats in (("user", user_cache.stats()),
+                         ("claims", claims_cache.stats()),
+                         ("contacts", contact_cache.stats())):
+        for key, result in CACHE_RESULTS.items():
+            if key in stats:
+                cache_requests.values[(cache, result)] = stats[key]
+        if "size" in stats:
+            cache_entries.set(cache, value=stats["size"])
+
+
+def collect_limiter() -> None:
+    stats = limiter.stats()
+    rate_limiter_buckets.set(value=stats["buckets"])
+    rate_limiter_rejected.values[()] = stats["rejected"]
+    rate_limiter_syncs.values[("ok",)] = stats["syncs"]
+    rate_limiter_syncs.values[("error",)] = stats["sync_errors"]
+
+
+registry.collectors.append(collect_caches)
+registry.collectors.append(collect_limiter)
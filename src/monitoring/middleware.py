@@ -0,0 +1,61 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from monitoring.metrics import (RequestCalls, http_duration, http_in_progress,
+                                http_rate_limited, http_requests,
+                                request_calls, request_db_time,
+                                request_queries, request_redis)
+from monitoring.queries import check_budget
+
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE",
+                     "OPTIONS"))
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request metrics.
+
+    Requests are labelled with the template of the matched route (the
+    router stores it in scope["route"]), never with the raw path, so
+    the number of series stays bounded; unmatched requests share one
+    label. Responses are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in METHODS else "OTHER"
+        status_code = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        calls = RequestCalls(scope)
+        token = request_calls.set(calls)
+        http_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_progress.dec(method)
+            request_calls.reset(token)
+            template = calls.route
+            http_requests.inc(method, template, str(status_code))
+            http_duration.observe(method, template, value=elapsed)
+            request_queries.observe(template, value=calls.queries)
+            request_db_time.observe(template, value=calls.query_time)
+            request_redis.observe(template, value=calls.redis)
+            if status_code == 429:
+                http_rate_limited.inc(template)
+            check_budget(calls)
@@ -0,0 +1,104 @@
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """
+    Connection pool statistics of one engine.
+
+    Counters come from the pool events (connect, checkout, checkin,
+    invalidate); the time a checkout waited for a free connection is
+    measured by InstrumentedPool, since the events fire only once the
+    connection is already taken.
+    Live gauges (size, checked out, overflow) are read from the pool on
+    every snapshot, so they survive engine.dispose() recreating it.
+    """
+
+    def __init__(self) -> None:
+        self.engine: Optional[AsyncEngine] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def attach(self, engine: AsyncEngine) -> None:
+        """Listen to the pool events of engine."""
+        self.engine = engine
+        target = engine.sync_engine
+        event.listen(target, "connect", self.on_connect)
+        event.listen(target, "checkout", self.on_checkout)
+        event.listen(target, "checkin", self.on_checkin)
+        event.listen(target, "invalidate", self.on_invalidate)
+
+    def on_connect(self, *_: Any) -> None:
+        self.connects += 1
+
+    def on_checkout(self, *_: Any) -> None:
+        self.checkouts += 1
+
+    def on_checkin(self, *_: Any) -> None:
+        self.checkins += 1
+
+    def on_invalidate(self, *_: Any) -> None:
+        self.invalidations += 1
+
+    def observe_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns:
+            Counters since start, wait times in milliseconds and, for a
+            queue pool, its current size and usage.
+        """
+        stats = {"connects": self.connects,
+                 "checkouts": self.checkouts,
+                 "checkins": self.checkins,
+                 "invalidations": self.invalidations,
+                 "timeouts": self.timeouts,
+                 "wait_count": self.waits,
+                 "wait_avg_ms": round(self.wait_total / self.waits * 1e3, 3)
+                 if self.waits else 0.0,
+                 "wait_max_ms": round(self.wait_max * 1e3, 3)}
+        pool = self.engine.sync_engine.pool if self.engine else None
+        if isinstance(pool, QueuePool):
+            stats.update({"pool_size": pool.size(),
+                          "checked_out": pool.checkedout(),
+                          "checked_in": pool.checkedin(),
+                          "overflow": pool.overflow(),
+                          "timeout": pool.timeout()})
+        return stats
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that reports to pool_stats how long each
+    checkout took, including waiting for a free slot and opening a new
+    connection, and how many gave up after the pool timeout.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.observe_wait(time.perf_counter() - started)
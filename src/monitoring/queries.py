@@ -0,0 +1,91 @@
+import logging
+import time
+from functools import lru_cache
+from urllib.parse import quote
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from monitoring.metrics import (RequestCalls, query_budget_exceeded,
+                                request_calls)
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more statements than its route's query budget."""
+
+
+def query_budget(route: str) -> int:
+    return settings.query_budgets.get(route, settings.query_budget)
+
+
+@lru_cache(maxsize=256)
+def route_comment(route: str) -> str:
+    # sqlcommenter format, route templates are few so the text is cached
+    return f" /*route='{quote(route, safe='')}'*/"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    calls = request_calls.get()
+    if calls is None:
+        return statement, parameters
+    calls.queries += 1
+    route = calls.route
+    if settings.query_budget_mode == "fail" \
+            and calls.queries > query_budget(route):
+        raise QueryBudgetExceeded(
+            f"{route} ran {calls.queries} statements, "
+            f"budget is {query_budget(route)}: {statement}")
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+    if settings.db_tag_queries:
+        statement += route_comment(route)
+    return statement, parameters
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context,
+                         executemany):
+    calls = request_calls.get()
+    started = conn.info.get("query_started")
+    if calls is not None and started:
+        calls.query_time += time.perf_counter() - started.pop()
+
+
+def handle_error(exception_context) -> None:
+    started = exception_context.connection.info.get("query_started") \
+        if exception_context.connection is not None else None
+    if request_calls.get() is not None and started:
+        started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Count and time the statements engine executes towards the current
+    request, tag them with a comment naming its route and enforce the
+    query budget (see check_budget).
+    """
+    target = engine.sync_engine
+    event.listen(target, "before_cursor_execute", before_cursor_execute,
+                 retval=True)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    event.listen(target, "handle_error", handle_error)
+
+
+def check_budget(calls: RequestCalls) -> None:
+    """
+    Report a finished request that went over its route's query budget,
+    settings.query_budgets overrides settings.query_budget per route
+    template. In "warn" mode it is logged, in "fail" mode the statement
+    over the budget has already raised QueryBudgetExceeded.
+    """
+    if settings.query_budget_mode == "off":
+        return
+    route = calls.route
+    budget = query_budget(route)
+    if calls.queries > budget:
+        query_budget_exceeded.inc(route)
+        logger.warning(f"{route} ran {calls.queries} statements "
+                       f"in {calls.query_time * 1e3:.1f} ms, "
+                       f"budget is {budget}")
@@ -0,0 +1,63 @@
+import hmac
+import time
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette import status
+from starlette.responses import Response
+
+from monitoring.metrics import registry
+from monitoring.pool import pool_stats
+from proxies import client_address, untrusted_forwarding
+from redis_pool import get_redis, pool_snapshot
+from settings import settings
+
+
+def internal_only(request: Request) -> None:
+    """
+    Admit requests with settings.internal_token as their bearer token or,
+    while no token is set, requests from settings.internal_hosts made
+    directly or through settings.trusted_proxies.
+    """
+    if settings.internal_token:
+        scheme, _, token = request.headers.get("Authorization", "") \
+            .partition(" ")
+        allowed = scheme.lower() == "bearer" and hmac.compare_digest(
+            token.encode(), settings.internal_token.encode())
+    else:
+        allowed = client_address(request) in settings.internal_hosts \
+            and not untrusted_forwarding(request)
+    if not allowed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Not Found")
+
+
+router = APIRouter(tags=["internal"],
+                   include_in_schema=False,
+                   dependencies=[Depends(internal_only)])
+
+
+@router.get("/internal/pool")
+async def get_pool_stats() -> dict[str, Any]:
+    return pool_stats.snapshot()
+
+
+@router.get("/internal/redis")
+async def get_redis_stats(
+        redis: Annotated[Redis, Depends(get_redis)]
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        await redis.ping()
+    except RedisError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail=f"Redis unavailable: {e}")
+    return {**pool_snapshot(),
+            "ping_ms": round((time.perf_counter() - started) * 1e3, 3)}
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    return Response(registry.render(), media_type=registry.content_type)
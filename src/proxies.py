@@ -0,0 +1,34 @@
+from typing import Optional
+
+from starlette.requests import Request
+
+from settings import settings
+
+# set by reverse proxies; behind one every client has the proxy's address
+FORWARDED_HEADERS = ("forwarded", "x-forwarded-for", "x-real-ip")
+
+
+def client_address(request: Request) -> Optional[str]:
+    """
+    Address of the client behind request.
+
+    X-Forwarded-For is only read when the direct peer is one of
+    settings.trusted_proxies; its hops are then walked from the right,
+    past the trusted proxies, so a client cannot pick its own address
+    by sending the header.
+    """
+    if request.client is None:
+        return None
+    address = request.client.host
+    hops = [hop.strip() for hop in
+            request.headers.get("x-forwarded-for", "").split(",")]
+    while address in settings.trusted_proxies and hops and hops[-1]:
+        address = hops.pop()
+    return address
+
+
+def untrusted_forwarding(request: Request) -> bool:
+    """True for a request with proxy headers set by an unknown proxy."""
+    return (request.client is None
+            or request.client.host not in settings.trusted_proxies) \
+        and any(header in request.headers for header in FORWARDED_HEADERS)
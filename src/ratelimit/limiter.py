@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette import status
+from starlette.requests import Request
+
+from proxies import client_address
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+LIMIT_RE = re.compile(r"(\d+)/(\d*)(ms|s|m|h)")
+
+
+class Limit(NamedTuple):
+    times: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.times / self.seconds
+
+
+@lru_cache(maxsize=64)
+def parse_limit(value: str) -> Limit:
+    """Parse a limit like "2/10s", "1/2m" or "100/h"."""
+    match = LIMIT_RE.fullmatch(value.replace(" ", ""))
+    if match is None:
+        raise ValueError(f"invalid rate limit {value!r}, "
+                         f"expected e.g. '2/10s'")
+    times, count, unit = match.groups()
+    return Limit(int(times), int(count or 1) * UNITS[unit])
+
+
+@lru_cache(maxsize=256)
+def route_limit(method: str, route: str) -> Limit:
+    """settings.rate_limits by "METHOD /route", then "/route", or the
+    default settings.rate_limit."""
+    return parse_limit(settings.rate_limits.get(
+        f"{method} {route}",
+        settings.rate_limits.get(route, settings.rate_limit)))
+
+
+class Bucket:
+    __slots__ = ("limit", "tokens", "updated", "pending", "window", "seen")
+
+    def __init__(self, limit: Limit, now: float) -> None:
+        self.limit = limit
+        self.tokens = float(limit.times)
+        self.updated = now
+        # hits not yet sent to Redis
+        self.pending = 0
+        # Redis window and the total it held after our last increment
+        self.window = -1
+        self.seen = 0
+
+
+class HybridLimiter:
+    """
+    Token buckets per client and route in process, reconciled with Redis.
+
+    Requests are admitted or rejected from the local bucket without a
+    network call. Every sync_interval seconds the hits counted since the
+    last sync are added in one pipeline to per-window counters in Redis,
+    and the hits the other workers added in the meantime are taken out of
+    the local buckets, so the limit holds across workers give or take what
+    each admits between two syncs. If Redis fails, fail="open" keeps
+    limiting per worker and fail="closed" rejects requests until a sync
+    succeeds. Without Redis the buckets are local only.
+    """
+    redis: Optional[Redis] = None
+    prefix = "ratelimit:"
+
+    def __init__(self,
+                 sync_interval: float,
+                 fail: str,
+                 size: int) -> None:
+        self.sync_interval = sync_interval
+        self.fail = fail
+        self.size = size
+        self.buckets: OrderedDict[str, Bucket] = OrderedDict()
+        self.dirty: set[str] = set()
+        self.synced_at = time.monotonic()
+        self.sync_task: Optional[asyncio.Task] = None
+        self.available = True
+        self.rejected = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    @classmethod
+    def init(cls, redis: Redis) -> None:
+        cls.redis = redis
+
+    def hit(self, key: str, limit: Limit) -> float:
+        """
+        Count a request of key against limit.
+
+        Args:
+            key (str): client and route the bucket is kept for
+            limit (Limit): the route's limit
+
+        Returns:
+            0 if the request is admitted, else seconds until it would be
+        """
+        now = time.monotonic()
+        if now - self.synced_at >= self.sync_interval:
+            self.schedule_sync(now)
+        if not self.available and self.fail == "closed" \
+                and self.redis is not None:
+            self.rejected += 1
+            return self.sync_interval
+
+        bucket = self.buckets.get(key)
+        if bucket is None or bucket.limit != limit:
+            bucket = self.buckets[key] = Bucket(limit, now)
+            while len(self.buckets) > self.size:
+                self.dirty.discard(self.buckets.popitem(last=False)[0])
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(limit.times, bucket.tokens
+                                + (now - bucket.updated) * limit.rate)
+            bucket.updated = now
+        if bucket.tokens < 1:
+            self.rejected += 1
+            return (1 - bucket.tokens) / limit.rate
+        bucket.tokens -= 1
+        if self.redis is not None:
+            bucket.pending += 1
+            self.dirty.add(key)
+        return 0
+
+    def schedule_sync(self, now: float) -> None:
+        self.synced_at = now
+        if self.redis is not None \
+                and (self.sync_task is None or self.sync_task.done()):
+            self.sync_task = asyncio.get_running_loop() \
+                .create_task(self.sync())
+
+    async def sync(self) -> None:
+        """Send the pending hits to Redis and take in the other workers'."""
+        if self.redis is None:
+            return
+        keys = [key for key in self.dirty if key in self.buckets]
+        self.dirty.clear()
+        batch = []
+        wall = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                bucket = self.buckets[key]
+                window = int(wall // bucket.limit.seconds)
+                counter = f"{self.prefix}{key}:{window}"
+                pipe.incrby(counter, bucket.pending)
+                pipe.expire(counter, math.ceil(bucket.limit.seconds) * 2)
+                batch.append((bucket, window, bucket.pending))
+            if not batch:
+                if self.available:
+                    return
+                # nothing to send, check whether Redis is back
+                pipe.ping()
+            try:
+                results = await pipe.execute()
+            except RedisError as e:
+                self.dirty.update(keys)
+                self.sync_errors += 1
+                if self.available:
+                    logger.warning(f"rate limiter sync failed, failing "
+                                   f"{self.fail}: {e}")
+                self.available = False
+                return
+
+        # the results alternate between INCRBY totals and EXPIRE flags
+        for (bucket, window, sent), total in zip(batch, results[::2]):
+            if bucket.window != window:
+                bucket.window, bucket.seen = window, 0
+            others = total - bucket.seen - sent
+            bucket.seen = total
+            bucket.pending -= sent
+            if others > 0:
+                bucket.tokens = max(0.0, bucket.tokens - others)
+        self.syncs += 1
+        self.available = True
+
+    async def close(self) -> None:
+        """Flush the pending hits, on shutdown."""
+        if self.sync_task is not None:
+            await self.sync_task
+        await self.sync()
+
+    def stats(self) -> dict[str, int]:
+        return {"buckets": len(self.buckets),
+                "rejected": self.rejected,
+                "syncs": self.syncs,
+                "sync_errors": self.sync_errors}
+
+
+limiter = HybridLimiter(sync_interval=settings.rate_limit_sync,
+                        fail=settings.rate_limit_fail,
+                        size=settings.rate_limit_buckets)
+
+
+def client_id(request: Request) -> str:
+    return client_address(request) or "unknown"
+
+
+async def rate_limit(request: Request) -> None:
+    """
+    Route dependency enforcing the route's rate limit per client.
+
+    Raises:
+        HTTPException: 429 with Retry-After when the client is over the
+            limit
+    """
+    route = request.scope["route"].path
+    retry_after = limiter.hit(
+        f"{client_id(request)}:{request.method} {route}",
+        route_limit(request.method, route))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too Many Requests",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
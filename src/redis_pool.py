@@ -0,0 +1,124 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import AbstractConnection
+
+from monitoring.metrics import (CountingConnection, redis_pool_connections,
+                                registry)
+from settings import settings
+
+
+class TrackingConnectionPool(BlockingConnectionPool):
+    """
+    BlockingConnectionPool that keeps its own count of the connections it
+    made and of those checked out, for shutdown and the pool metrics.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self.created = 0
+        self.in_use: set[AbstractConnection] = set()
+
+    def make_connection(self) -> AbstractConnection:
+        self.created += 1
+        return super().make_connection()
+
+    async def get_connection(self, *args: Any,
+                             **kwargs: Any) -> AbstractConnection:
+        connection = await super().get_connection(*args, **kwargs)
+        self.in_use.add(connection)
+        return connection
+
+    async def release(self, connection: AbstractConnection) -> None:
+        self.in_use.discard(connection)
+        await super().release(connection)
+
+
+# one pool for the whole app; responses are bytes, consumers decode what
+# they need. Counting connections report round trips to the request metrics
+pool = TrackingConnectionPool(
+    connection_class=CountingConnection,
+    host=settings.redis_server,
+    port=settings.redis_port,
+    db=settings.redis_db,
+    password=settings.redis_pass or None,
+    max_connections=settings.redis_pool_size,
+    timeout=settings.redis_pool_timeout,
+    socket_timeout=settings.redis_socket_timeout,
+    socket_connect_timeout=settings.redis_connect_timeout,
+    health_check_interval=settings.redis_health_check_interval)
+redis = Redis(connection_pool=pool)
+
+
+async def get_redis() -> AsyncIterator[Redis]:
+    yield redis
+
+
+async def close_redis(timeout: Optional[float] = None) -> None:
+    """
+    Wait up to timeout seconds for the connections in use to come back,
+    then close every connection of the pool.
+    """
+    deadline = time.monotonic() + (settings.redis_pool_timeout
+                                   if timeout is None else timeout)
+    while pool.in_use and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await redis.aclose(close_connection_pool=True)
+
+
+def pool_snapshot() -> dict[str, int]:
+    return {"max_connections": pool.max_connections,
+            "in_use": len(pool.in_use),
+            "idle": pool.created - len(pool.in_use)}
+
+
+def collect_pool() -> None:
+    for state, value in pool_snapshot().items():
+        redis_pool_connections.set(state, value=value)
+
+
+registry.collectors.append(collect_pool)
+
+
+async def pipelined(client: Redis,
+                    commands: Iterable[tuple[str, tuple, dict]]) -> list[Any]:
+    """
+    Run commands in one round trip, without MULTI.
+
+    Args:
+        client (Redis): the client to run them on
+        commands (Iterable[tuple]): (method name, args, kwargs) of each
+            command, e.g. ("set", (key, value), {"ex": 60})
+
+    Returns:
+        the replies, in order
+    """
+    async with client.pipeline(transaction=False) as pipe:
+        for name, args, kwargs in commands:
+            getattr(pipe, name)(*args, **kwargs)
+        return await pipe.execute()
+
+
+async def get_many(client: Redis, keys: list[str]) -> list[Optional[bytes]]:
+    """Values of keys in one MGET, None for the missing ones."""
+    return await client.mget(keys) if keys else []
+
+
+async def set_many(client: Redis,
+                   values: Mapping[str, Any],
+                   ex: Optional[int] = None) -> None:
+    """SET each key of values, with an expiry of ex seconds, pipelined."""
+    if values:
+        await pipelined(client, (("set", (key, value), {"ex": ex})
+                                 for key, value in values.items()))
+
+
+async def delete_many(client: Redis, keys: list[str]) -> int:
+    """UNLINK keys in one call, returning how many existed."""
+    return await client.unlink(*keys) if keys else 0
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +17,13 @@ class EnvSettings(BaseSettings):
     secret_512: str
     access_algorithm: str
     refresh_algorithm: str
+    # PEM files for asymmetric algorithms (ES256, EdDSA, RS256), a public
+    # key alone only verifies tokens
+    access_private_key: Optional[Path] = None
+    access_public_key: Optional[Path] = None
+    refresh_private_key: Optional[Path] = None
+    refresh_public_key: Optional[Path] = None
+    token_backend: Literal["auto", "hmac", "jose", "pyjwt"] = "auto"
     mail_user: str
     mail_pass: str
     mail_server: str
@@ -24,7 +32,59 @@ class EnvSettings(BaseSettings):
     redis_server: str
     redis_port: int
     redis_pass: str
+    redis_db: int = 0
+    redis_pool_size: int = 50
+    # seconds to wait for a free connection of the pool
+    redis_pool_timeout: float = 5.0
+    redis_socket_timeout: float = 5.0
+    redis_connect_timeout: float = 2.0
+    redis_health_check_interval: int = 30
     cloudinary_url: str
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # reverse proxies whose X-Forwarded-For names the client, for the
+    # rate limiter and internal_hosts; empty trusts no forwarding headers
+    trusted_proxies: list[str] = []
+    # /metrics and /internal/*: a request sending the token as a bearer
+    # token is let in; without a token only requests from internal_hosts
+    # are, made directly or through trusted_proxies
+    internal_token: str = ""
+    internal_hosts: list[str] = ["127.0.0.1", "::1"]
+    query_budget: int = 10
+    # routes whose statement count grows with the request body
+    query_budgets: dict[str, int] = {"/contacts/import": 100}
+    query_budget_mode: Literal["off", "warn", "fail"] = "warn"
+    db_tag_queries: bool = True
+    # "times/period", period in ms, s, m or h
+    rate_limit: str = "2/10s"
+    # "METHOD /route" or "/route" templates with a limit of their own
+    rate_limits: dict[str, str] = {"/users/profile/": "2/40s",
+                                   "/users/update-avatar/": "2/40s",
+                                   "/users/avatar": "1/2m",
+                                   "/contacts/import": "1/10s",
+                                   "/contacts/export": "1/10s"}
+    rate_limit_fail: Literal["open", "closed"] = "open"
+    rate_limit_sync: float = 0.5
+    rate_limit_buckets: int = 65536
+    password_executor: Literal["thread", "process"] = "thread"
+    password_workers: int = 2
+    password_queue_size: int = 32
+    user_cache_size: int = 4096
+    user_cache_local_ttl: float = 5.0
+    user_cache_ttl: int = 300
+    token_cache_size: int = 4096
+    contacts_page_size: int = 50
+    contacts_page_max: int = 500
+    contacts_import_batch: int = 500
+    contacts_import_max_errors: int = 1000
+    contacts_export_chunk: int = 1000
+    contacts_patch_max: int = 500
+    contacts_cache_ttl: int = 60
+    contacts_cache_lock_ttl: float = 5.0
+    contacts_cache_wait: float = 1.0
 
 
 # production environment
@@ -20,6 +20,20 @@ class UserDB(UserModel):
     hashed_pwd: str = Field(max_length=255)
 
 
+class UserAuth(BaseModel):
+    """
+    Snapshot of an authenticated user, as cached by auth.cache.
+
+    Only what the routes need to authorize a request; the password hash is
+    read from the database by login alone.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: EmailStr
+    email_confirmed: Optional[bool] = None
+
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
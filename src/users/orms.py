@@ -13,6 +13,7 @@ class User(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(255), unique=True)
     hashed_pwd: Mapped[str] = mapped_column()
+    # unused since sessions live in Redis, kept for existing databases
     loggedin: Mapped[Optional[bool]] = mapped_column(default=False)
     email_confirmed: Mapped[Optional[bool]] = mapped_column(default=False)
     avatar_url: Mapped[Optional[str]] = mapped_column(default=None)
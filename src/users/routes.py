@@ -1,8 +1,8 @@
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, UploadFile
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 import cloudinary
 from cloudinary.uploader import upload, destroy
 from cloudinary.utils import cloudinary_url
@@ -11,8 +11,9 @@ from starlette.responses import JSONResponse, Response
 
 from db import get_db
 from users.orms import User
-from users.models import UserDB
+from users.models import UserDB, UserAuth
 from auth.service import Authentication
+from ratelimit.limiter import rate_limit
 from settings import settings
 
 
@@ -23,21 +24,22 @@ router = APIRouter(prefix="/users",
 
 
 @router.get("/profile/",
-            dependencies=[Depends(RateLimiter(times=2, seconds=40))],
+            dependencies=[Depends(rate_limit)],
             response_model=UserDB)
 async def get_profile(
-        user: Annotated[User, Depends(auth_service.get_access_user)]
+        user: Annotated[UserAuth, Depends(auth_service.get_access_user)],
+        db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Any:
-    return UserDB.from_orm(user)
+    return UserDB.from_orm(await db.get(User, user.id))
 
 
 @router.post('/update-avatar/',
-             dependencies=[Depends(RateLimiter(times=2, seconds=40))])
+             dependencies=[Depends(rate_limit)])
 @router.patch('/update-avatar/',
-              dependencies=[Depends(RateLimiter(times=2, seconds=40))])
+              dependencies=[Depends(rate_limit)])
 async def update_avatar(
-        user: Annotated[User, Depends(auth_service.get_access_user)],
-        db: Annotated[Session, Depends(get_db)],
+        user: Annotated[UserAuth, Depends(auth_service.get_access_user)],
+        db: Annotated[AsyncSession, Depends(get_db)],
         avatar: UploadFile
 ) -> Any:
     cldry_config = cloudinary.config(secure=True)
@@ -55,8 +57,10 @@ async def update_avatar(
         gravity='face',
         version=cldry_response.get('version')
     )
-    user.avatar_url = avatar_url
-    db.commit()
+    await db.execute(update(User).filter_by(id=user.id)
+                     .values(avatar_url=avatar_url))
+    await db.commit()
+    await auth_service.USER_CACHE.invalidate(user.email)
 
     return JSONResponse(
         status_code=201,
@@ -67,17 +71,19 @@ async def update_avatar(
 
 
 @router.delete("/avatar",
-               dependencies=[Depends(RateLimiter(times=1, minutes=2))],
+               dependencies=[Depends(rate_limit)],
                responses={204: {"model": None}})
 async def delete_avatar(
-        user: Annotated[User, Depends(auth_service.get_access_user)],
-        db: Annotated[Session, Depends(get_db)]
+        user: Annotated[UserAuth, Depends(auth_service.get_access_user)],
+        db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Any:
     cldry_config = cloudinary.config(secure=True)
     cldry_config._load_from_url(settings.cloudinary_url)
     cldry_response = destroy(public_id=f"hw13/{user.email}")
     print(cldry_response)
-    user.avatar_url = None
-    db.commit()
+    await db.execute(update(User).filter_by(id=user.id)
+                     .values(avatar_url=None))
+    await db.commit()
+    await auth_service.USER_CACHE.invalidate(user.email)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
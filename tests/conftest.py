@@ -1,36 +1,49 @@
-from unittest.mock import AsyncMock
+import asyncio
+from datetime import timedelta
 
 import pytest
+from bcrypt import gensalt, hashpw
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import event
 from fastapi.testclient import TestClient
-from fastapi_limiter.depends import RateLimiter
-from sqlalchemy import create_engine, StaticPool
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 
 from src.main import app
 
-from src.db import Base, get_db
+# routes resolve `db` from src/, so the override has to target that module
+from db import Base, get_db, get_sessionmaker
 from src.auth.service import Authentication as auth_service
+# like db, the session store the routes use is the one imported from src/
+from auth.sessions import SessionStore, sessions
+from ratelimit.limiter import rate_limit
+from users.orms import User
 import logging
 
 logging.basicConfig(filename='debug.log', level=logging.DEBUG)
 
 
-# SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test_db.sqlite"
+# SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test_db.sqlite"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL,
-                       connect_args={"check_same_thread": False},
-                       poolclass=StaticPool)
+engine = create_async_engine(SQLALCHEMY_DATABASE_URL,
+                             connect_args={"check_same_thread": False},
+                             poolclass=StaticPool)
 
-TestingSession = sessionmaker(autocommit=False,
-                              autoflush=False,
-                              bind=engine)
+TestingSession = async_sessionmaker(autoflush=False,
+                                    expire_on_commit=False,
+                                    bind=engine)
+
+
+async def create_schema():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
 
 
 @pytest.fixture(scope='module')
 def session():
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    asyncio.run(create_schema())
     logging.info(f"Database tables: {Base.metadata.tables}")
     db = TestingSession()
     try:
@@ -38,28 +51,47 @@ def session():
         yield db
     finally:
         logging.debug(f"session close: {db}")
-        db.close()
+        asyncio.run(db.close())
+
+
+async def no_rate_limit():
+    pass
 
 
 @pytest.fixture(scope='module')
 def client(session):
     # Dependency override
-    def override_get_db():
+    async def override_get_db():
         try:
             logging.debug(f"session yield: {session}")
             yield session
         except Exception as e:
             logging.error(f"session error: {e}")
+            raise
         finally:
             logging.debug(f"session close: {session}")
-            session.close()
+            await session.close()
 
     app.dependency_overrides[get_db] = override_get_db
-    app.dependency_overrides[RateLimiter] = AsyncMock()
+    app.dependency_overrides[get_sessionmaker] = lambda: TestingSession
+    app.dependency_overrides[rate_limit] = no_rate_limit
     logging.debug(f"app.dependency_overrides: {app.dependency_overrides}")
     yield TestClient(app)
 
 
+@pytest.fixture()
+def queries(session):
+    """Statements the test engine runs while the fixture is active."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
 @pytest.fixture(scope='module')
 def user():
     return {
@@ -74,8 +106,34 @@ def user():
 
 
 @pytest.fixture(scope='module')
-def get_access_token():
-    return auth_service.create_access_token(
-        auth_service,
-        email="djedai@tatuin.emp"
-    )
\ No newline at end of file
+def db_user(session, user):
+    """
+    The user of get_access_token in the database, confirmed, with
+    user["hashed_pwd"] as the password it logs in with.
+    """
+    async def add_user():
+        db_user = User(email=user["email"],
+                       hashed_pwd=hashpw(user["hashed_pwd"].encode(),
+                                         gensalt(rounds=4)).decode(),
+                       email_confirmed=True)
+        session.add(db_user)
+        await session.commit()
+        return db_user
+    return asyncio.run(add_user())
+
+
+@pytest.fixture(scope='module')
+def session_store():
+    SessionStore.init(FakeAsyncRedis())
+    yield sessions
+    SessionStore.redis = None
+
+
+@pytest.fixture(scope='module')
+def get_access_token(session_store):
+    session = asyncio.run(session_store.create("djedai@tatuin.emp",
+                                               timedelta(hours=1)))
+    return auth_service().create_access_token(
+        email="djedai@tatuin.emp",
+        session=session
+    )
@@ -1,11 +1,14 @@
+import asyncio
 import unittest
 from datetime import datetime, timedelta, timezone
 
 from bcrypt import hashpw, gensalt
+from fastapi import HTTPException
 from jose import jwt
 
 from src.db import get_db
 from src.auth.service import Authentication as auth_service
+from src.auth.hashing import PasswordHasher
 
 
 class TestAuthentication(unittest.TestCase):
@@ -31,8 +34,7 @@ class TestAuthentication(unittest.TestCase):
     def test_create_refresh_token_success(self):
         current_time = datetime.now(timezone.utc)
         expiration = current_time + timedelta(days=7)
-        token = auth_service.create_refresh_token(
-            auth_service,
+        token = auth_service().create_refresh_token(
             email="some@email.com",
         )
         check_payload = {'sub': 'some@email.com',
@@ -47,8 +49,7 @@ class TestAuthentication(unittest.TestCase):
     def test_create_access_token_success(self):
         current_time = datetime.now(timezone.utc)
         expiration = current_time + timedelta(minutes=15)
-        token = auth_service.create_access_token(
-            auth_service,
+        token = auth_service().create_access_token(
             email="some@email.com",
         )
         check_payload = {'sub': 'some@email.com',
@@ -61,5 +62,45 @@ class TestAuthentication(unittest.TestCase):
         self.assertDictEqual(payload, check_payload)
 
 
+class TestPasswordHasher(unittest.IsolatedAsyncioTestCase):
+    hashed_password = hashpw("password".encode(),
+                             gensalt(rounds=4)).decode()
+
+    def setUp(self):
+        self.hasher = PasswordHasher(kind="thread",
+                                     workers=1,
+                                     queue_size=1)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+
+    async def test_verify_success(self):
+        self.assertIs(True,
+                      await self.hasher.verify("password",
+                                               self.hashed_password))
+
+    async def test_hash_verifiable(self):
+        hashed = await self.hasher.hash("password")
+        self.assertIs(True,
+                      await self.hasher.verify("password", hashed))
+
+    async def test_rejects_when_queue_full(self):
+        release = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def blocked():
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+
+        busy = [asyncio.create_task(self.hasher.run(blocked))
+                for _ in range(2)]
+        await asyncio.sleep(0)
+        with self.assertRaises(HTTPException) as exc:
+            await self.hasher.verify("password", self.hashed_password)
+        self.assertEqual(exc.exception.status_code, 503)
+        release.set()
+        await asyncio.gather(*busy)
+        self.assertEqual(self.hasher.pending, 0)
+
+
 if __name__ == "__main__":
     unittest.main()
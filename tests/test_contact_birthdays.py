@@ -0,0 +1,67 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from contacts.orms import ContactORM
+from users.orms import User
+
+
+class NewYearsEve(date):
+    @classmethod
+    def today(cls):
+        return cls(2024, 12, 29)
+
+
+@pytest.fixture(scope='module')
+def headers(client, session, db_user, get_access_token):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.post("/contacts/", headers=headers, json=[
+        dict(first_name="Jan2", birthday="1990-01-02"),
+        dict(first_name="Dec28", birthday="1985-12-28"),
+        dict(first_name="Dec30", birthday="2000-12-30"),
+        dict(first_name="Jan10", birthday="1970-01-10"),
+        dict(first_name="Dec29", birthday="1999-12-29"),
+        dict(first_name="NoBirthday"),
+    ])
+    assert response.status_code == 200, response.text
+
+    async def add_other_owner():
+        other = User(email="sith@tatuin.emp", hashed_pwd="x")
+        session.add(other)
+        await session.flush()
+        session.add(ContactORM(first_name="OtherDec31",
+                               birthday=date(1980, 12, 31),
+                               owner=other.id))
+        await session.commit()
+    asyncio.run(add_other_owner())
+    return headers
+
+
+def names(response) -> list[str]:
+    assert response.status_code == 200, response.text
+    return [contact["first_name"] for contact in response.json()]
+
+
+def test_window_wraps_past_new_year(client, headers, monkeypatch):
+    monkeypatch.setattr("contacts.routes.date", NewYearsEve)
+    # soonest first: today, then the rest of December, then January;
+    # the other owner's Dec 31 contact is never listed
+    assert names(client.get("/contacts/bd_mates", headers=headers)) == \
+        ["Dec29", "Dec30", "Jan2"]
+    assert names(client.get("/contacts/bd_mates/13", headers=headers)) == \
+        ["Dec29", "Dec30", "Jan2", "Jan10"]
+
+
+def test_whole_year_in_upcoming_order(client, headers, monkeypatch):
+    monkeypatch.setattr("contacts.routes.date", NewYearsEve)
+    assert names(client.get("/contacts/bd_mates/366", headers=headers)) == \
+        ["Dec29", "Dec30", "Jan2", "Jan10", "Dec28"]
+
+
+def test_no_mates(client, headers, monkeypatch):
+    monkeypatch.setattr("contacts.routes.date", NewYearsEve)
+    assert client.get("/contacts/bd_mates/0",
+                      headers=headers).status_code == 404
+    assert client.get("/contacts/bd_mates/1",
+                      headers=headers).status_code == 200
@@ -0,0 +1,32 @@
+def test_bulk_create_reports_each_row(client, db_user, get_access_token):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.post("/contacts/", headers=headers,
+                           json=dict(first_name="Taras",
+                                     last_name="Shevchenko",
+                                     email="t@s.ua"))
+    assert response.status_code == 200, response.text
+
+    response = client.post("/contacts/", headers=headers, json=[
+        dict(first_name="Ivan", last_name="Franko", phone="0501234567"),
+        dict(first_name="Taras", last_name="Shevchenko"),
+        dict(first_name="Lesya", email="t@s.ua"),
+        dict(first_name="Ivan", last_name="Franko"),
+        dict(first_name="Lesya", last_name="Ukrainka", birthday="1871-02-25"),
+    ])
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [result["status"] for result in results] == \
+        [201, 409, 409, 409, 201]
+
+    created = results[0]["contact"]
+    assert created["full_name"] == "Ivan Franko"
+    assert created["phone"] == "0501234567"
+    assert results[4]["contact"]["birthday"] == "1871-02-25"
+    for result in results[1:4]:
+        assert result["contact"] is None
+        assert "already exists" in result["msg"]
+
+    stored = client.get("/contacts/", headers=headers).json()["items"]
+    assert [contact["full_name"] for contact in stored] == \
+        ["Taras Shevchenko", "Ivan Franko", "Lesya Ukrainka"]
+    assert stored[1]["id"] == created["id"]
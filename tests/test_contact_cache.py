@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+import zlib
+
+from fakeredis import FakeAsyncRedis
+from starlette.responses import Response
+
+from src.contacts.cache import ContactCache
+
+
+class TestContactCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = ContactCache(ttl=60, lock_ttl=5, wait=1)
+        self.cache.redis = FakeAsyncRedis()
+        self.cache.poll_interval = 0.01
+        self.renders = 0
+
+    async def render(self, status_code: int = 200) -> Response:
+        self.renders += 1
+        await asyncio.sleep(0.05)
+        return Response(b'[{"id": 1}]' * 10, status_code=status_code)
+
+    async def test_miss_then_hit(self):
+        body, response = await self.cache.fetch("1:1:abc", self.render)
+        self.assertIsNone(body)
+        self.assertEqual(response.status_code, 200)
+        body, response = await self.cache.fetch("1:1:abc", self.render)
+        self.assertEqual(body, b'[{"id": 1}]' * 10)
+        self.assertIsNone(response)
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+    async def test_stored_compressed_with_ttl(self):
+        await self.cache.fetch("1:1:abc", self.render)
+        raw = await self.cache.redis.get("contacts:cache:1:1:abc")
+        self.assertLess(len(raw), 110)
+        self.assertEqual(zlib.decompress(raw), b'[{"id": 1}]' * 10)
+        self.assertGreater(await self.cache.redis.ttl("contacts:cache:1:1:abc"),
+                           0)
+
+    async def test_errors_are_not_cached(self):
+        await self.cache.fetch("1:1:abc", lambda: self.render(404))
+        await self.cache.fetch("1:1:abc", lambda: self.render(404))
+        self.assertEqual(self.renders, 2)
+
+    async def test_stampede_renders_once(self):
+        results = await asyncio.gather(*(self.cache.fetch("1:1:abc",
+                                                          self.render)
+                                         for _ in range(10)))
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(sum(body is not None for body, _ in results), 9)
+        self.assertEqual(self.cache.stats()["waited_hits"], 9)
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from contacts.formats import parse_stream
+from contacts.orms import ContactORM
+from users.orms import User
+
+
+@pytest.fixture(scope='module')
+def headers(client, session, db_user, get_access_token):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.post("/contacts/", headers=headers, json=[
+        dict(first_name="Taras", last_name="Shevchenko",
+             email="taras@kobzar.ua", birthday="1814-03-09",
+             extra="poet, artist; \"Kobzar\""),
+        dict(first_name="Lesya", last_name="Ukrainka", phone="0501234567"),
+        dict(first_name="Ivan"),
+    ])
+    assert response.status_code == 200, response.text
+
+    async def add_other_owner():
+        other = User(email="sith@tatuin.emp", hashed_pwd="x")
+        session.add(other)
+        await session.flush()
+        session.add(ContactORM(first_name="Darth", last_name="Vader",
+                               owner=other.id))
+        await session.commit()
+    asyncio.run(add_other_owner())
+    return headers
+
+
+def parse(body: bytes, fmt: str) -> list:
+    async def chunks():
+        yield body
+
+    async def collect():
+        return [record async for _, record in parse_stream(chunks(), fmt)]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("fmt", ["csv", "ndjson", "vcf"])
+def test_export_parses_back(client, headers, fmt):
+    response = client.get(f"/contacts/export?format={fmt}", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"] == \
+        f"attachment; filename=contacts.{fmt}"
+
+    records = parse(response.content, fmt)
+    assert [record["first_name"] for record in records] == \
+        ["Taras", "Lesya", "Ivan"]
+    taras, lesya, ivan = records
+    assert taras["last_name"] == "Shevchenko"
+    assert taras["email"] == "taras@kobzar.ua"
+    assert taras["birthday"] == "1814-03-09"
+    assert taras["extra"] == "poet, artist; \"Kobzar\""
+    assert lesya["phone"] == "0501234567"
+    assert ivan["last_name"] is None
+
+
+def test_export_needs_a_token(client, headers):
+    assert client.get("/contacts/export").status_code == 401
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import date
+
+from src.contacts.formats import (parse_stream, parse_csv, iter_lines,
+                                  csv_header, SERIALIZERS, MAX_RECORD_LENGTH)
+
+
+async def chunked(body: str, size: int = 5):
+    data = body.encode()
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def parse(body: str, fmt: str) -> list:
+    async def collect():
+        return [_ async for _ in parse_stream(chunked(body), fmt)]
+    return asyncio.run(collect())
+
+
+def test_csv_rows_and_errors():
+    body = ('first_name,last_name,extra\r\n'
+            'Vasyl,Petrenko,"two\nlines"\r\n'
+            'Taras,,\r\n'
+            'Broken\r\n')
+    rows = parse(body, "csv")
+    assert rows[0] == (1, {"first_name": "Vasyl",
+                           "last_name": "Petrenko",
+                           "extra": "two\nlines"})
+    assert rows[1] == (2, {"first_name": "Taras",
+                           "last_name": None,
+                           "extra": None})
+    assert rows[2][0] == 3
+    assert isinstance(rows[2][1], ValueError)
+
+
+def test_csv_record_length_capped():
+    def parse_short(body: str) -> list:
+        async def collect():
+            return [_ async for _ in parse_csv(iter_lines(chunked(body)),
+                                               max_length=50)]
+        return asyncio.run(collect())
+
+    header = 'first_name,last_name,extra\r\n'
+    rows = parse_short(header + 'Vasyl,Petrenko,"' + 'long\n' * 30 +
+                       '"\r\nTaras,,\r\n')
+    assert [row for row, _ in rows] == [1, 2]
+    assert str(rows[0][1]) == "record longer than 50 characters"
+    assert rows[1][1]["first_name"] == "Taras"
+
+    rows = parse_short(header + 'Vasyl,"stray quote\r\n' + 'Taras,,\r\n' * 30)
+    assert len(rows) == 1
+    assert str(rows[0][1]) == "unterminated quoted field"
+
+
+def test_long_lines_dropped_while_streaming():
+    async def endless_line(prefix: bytes, suffix: bytes):
+        yield prefix
+        for _ in range(400):
+            yield b"x" * 65536
+        yield suffix
+
+    def parse_long(prefix: str, suffix: str, fmt: str) -> list:
+        async def collect():
+            return [_ async for _ in parse_stream(
+                endless_line(prefix.encode(), suffix.encode()), fmt)]
+        return asyncio.run(collect())
+
+    error = f"line longer than {MAX_RECORD_LENGTH} characters"
+    rows = parse_long("first_name\nTaras\n", "\nLesya\n", "csv")
+    assert [(row, str(record)) for row, record in rows[1:]] == \
+        [(2, error), (3, "{'first_name': 'Lesya'}")]
+    rows = parse_long('{"first_name": "', '"}\n{"first_name": "Lesya"}',
+                      "ndjson")
+    assert [(row, str(record)) for row, record in rows] == \
+        [(1, error), (2, "{'first_name': 'Lesya'}")]
+    rows = parse_long("BEGIN:VCARD\r\nNOTE:",
+                      "\r\nEND:VCARD\r\nBEGIN:VCARD\r\nFN:Lesya\r\n"
+                      "END:VCARD\r\n", "vcf")
+    assert [(row, str(record)) for row, record in rows] == \
+        [(1, error), (2, "{'first_name': 'Lesya', 'last_name': None}")]
+    for fmt in ("csv", "ndjson"):
+        assert [str(record) for _, record in parse_long("", "", fmt)] == \
+            [error]
+
+
+def test_ndjson_skips_blank_lines():
+    body = '{"first_name": "Ольга"}\n\n[1]\n'
+    rows = parse(body, "ndjson")
+    assert rows[0] == (1, {"first_name": "Ольга"})
+    assert isinstance(rows[1][1], ValueError)
+
+
+def test_vcard_folding_and_mapping():
+    body = ("BEGIN:VCARD\r\n"
+            "N:Shevchenko;Taras;;;\r\n"
+            "TEL;TYPE=cell:+38 (050) 123-45-67\r\n"
+            "BDAY:18140309\r\n"
+            "NOTE:poet\\, ar\r\n"
+            " tist\r\n"
+            "END:VCARD\r\n")
+    assert parse(body, "vcf") == [(1, {"first_name": "Taras",
+                                       "last_name": "Shevchenko",
+                                       "phone": "380501234567",
+                                       "birthday": "1814-03-09",
+                                       "extra": "poet, artist"})]
+
+
+def test_export_parses_back():
+    rows = [(1, "Taras", "Shevchenko", "taras@x.com", "380501234567",
+             date(1814, 3, 9), "poet, artist; \"Kobzar\"\nline"),
+            (2, "Lesya", None, None, None, None, None),
+            (3, "Ivan\\Jr", "Franko; \\Kamenyar\\, \\n", None, None, None,
+             "back\\slash\\")]
+    for fmt in ("csv", "ndjson", "vcf"):
+        body = (csv_header() if fmt == "csv" else "") + \
+            SERIALIZERS[fmt](rows)
+        records = [record for _, record in parse(body, fmt)]
+        assert records[0]["first_name"] == "Taras"
+        assert records[0]["birthday"] == "1814-03-09"
+        assert records[0]["extra"] == "poet, artist; \"Kobzar\"\nline"
+        assert records[1]["first_name"] == "Lesya"
+        assert records[1]["last_name"] is None
+        assert records[2]["first_name"] == "Ivan\\Jr"
+        assert records[2]["last_name"] == "Franko; \\Kamenyar\\, \\n"
+        assert records[2]["extra"] == "back\\slash\\"
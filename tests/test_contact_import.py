@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from sqlalchemy.exc import DataError
+
+from contacts.service import insert_contacts
+
+
+@pytest.fixture(scope='module')
+def headers(db_user, get_access_token):
+    return {'Authorization': f'Bearer {get_access_token}'}
+
+
+async def strict_insert(db, owner, contacts):
+    """insert_contacts, then failing like Postgres on a too long first_name"""
+    stored = await insert_contacts(db, owner=owner, contacts=contacts)
+    if any(len(contact.first_name) > 20 for contact in contacts):
+        raise DataError("INSERT INTO contacts", None,
+                        Exception("value too long for type "
+                                  "character varying(20)"))
+    return stored
+
+
+def test_failed_batch_retried_row_by_row(client, headers, monkeypatch):
+    monkeypatch.setattr("contacts.routes.insert_contacts", strict_insert)
+    monkeypatch.setattr("settings.settings.contacts_import_batch", 2)
+    names = ["Ivan", "Olena", "Petro", "X" * 21, "Taras"]
+    body = "".join(json.dumps({"first_name": name}) + "\n" for name in names)
+
+    response = client.post("/contacts/import?format=ndjson",
+                           headers=headers, content=body)
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "inserted": 4,
+        "failed": 1,
+        "errors": [{"row": 4,
+                    "msg": "Contact could not be stored: value too long "
+                           "for type character varying(20)"}]}
+
+    # the rejected batch left nothing behind, the others were kept
+    stored = client.get("/contacts/", headers=headers).json()["items"]
+    assert [contact["first_name"] for contact in stored] == \
+        ["Ivan", "Olena", "Petro", "Taras"]
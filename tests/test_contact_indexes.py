@@ -0,0 +1,65 @@
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import event
+
+# a SQLite plan line for contacts without USING is a full table scan
+CONTACTS_SCAN = re.compile(r"^(SCAN|SEARCH) contacts\b")
+
+
+@pytest.fixture()
+def statements(session):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if re.search(r"\bcontacts\b", statement) \
+                and not statement.lstrip().startswith(("INSERT", "EXPLAIN")):
+            captured.append((statement, parameters))
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(sync_engine, "before_cursor_execute", capture)
+
+
+def explain(session, statement, parameters):
+    async def plan():
+        async with session.bind.connect() as conn:
+            res = await conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            )
+            return [row[-1] for row in res]
+    return asyncio.run(plan())
+
+
+def test_route_queries_use_indexes(client, db_user, get_access_token,
+                                   statements, session):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    for i in range(3):
+        client.post("/contacts/", headers=headers,
+                    json=dict(first_name=f"Vasyl{i}", last_name="Petrenko",
+                              email=f"v{i}@x.com", birthday="1990-01-02"))
+    statements.clear()
+
+    for method, url in [
+        ("get", "/contacts/"),
+        ("get", "/contacts/?after=1"),
+        ("get", "/contacts/1"),
+        ("get", "/contacts/find?value=Petr"),
+        ("get", "/contacts/find?value=v1@x.com&field=email"),
+        ("get", "/contacts/find?value=Va&field=first_name"),
+        ("get", "/contacts/bd_mates/365"),
+        ("put", "/contacts/1/add/phone/1234567"),
+        ("patch", "/contacts/1/edit/phone/7654321"),
+        ("delete", "/contacts/1/delete/phone"),
+        ("delete", "/contacts/delete/2"),
+    ]:
+        response = getattr(client, method)(url, headers=headers)
+        assert response.status_code < 300, (url, response.text)
+
+    assert statements
+    for statement, parameters in list(statements):
+        for detail in explain(session, statement, parameters):
+            if CONTACTS_SCAN.match(detail):
+                assert "USING" in detail, (statement, detail)
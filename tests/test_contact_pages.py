@@ -0,0 +1,51 @@
+import pytest
+
+from settings import settings
+
+
+@pytest.fixture(scope='module')
+def headers(client, db_user, get_access_token):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.post("/contacts/", headers=headers,
+                           json=[dict(first_name=f"Page{i}")
+                                 for i in range(5)])
+    assert response.status_code == 200, response.text
+    return headers
+
+
+def test_next_cursor_walks_all_pages(client, headers):
+    pages, after = [], None
+    while True:
+        params = {"limit": 2} if after is None else {"limit": 2,
+                                                     "after": after}
+        page = client.get("/contacts/", headers=headers, params=params).json()
+        pages.append([contact["first_name"] for contact in page["items"]])
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert pages == [["Page0", "Page1"], ["Page2", "Page3"], ["Page4"]]
+
+
+def test_exhausted_last_page(client, headers):
+    # a last page that is exactly full has no cursor to an empty page
+    page = client.get("/contacts/?limit=5", headers=headers).json()
+    assert len(page["items"]) == 5
+    assert page["next_cursor"] is None
+
+    last_id = page["items"][-1]["id"]
+    page = client.get(f"/contacts/?after={last_id}", headers=headers).json()
+    assert page == {"items": [], "next_cursor": None}
+
+
+def test_limit_cap(client, headers):
+    assert client.get(f"/contacts/?limit={settings.contacts_page_max}",
+                      headers=headers).status_code == 200
+    for limit in (0, settings.contacts_page_max + 1):
+        assert client.get(f"/contacts/?limit={limit}",
+                          headers=headers).status_code == 422
+
+
+def test_invalid_cursor(client, headers):
+    for after in ("-1", "abc", "1.5"):
+        assert client.get(f"/contacts/?after={after}",
+                          headers=headers).status_code == 422
@@ -0,0 +1,46 @@
+from unittest.mock import AsyncMock
+
+
+def test_patch_many_contacts(client, db_user, get_access_token, monkeypatch):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    for i in range(3):
+        client.post("/contacts/", headers=headers,
+                    json=dict(first_name=f"Vasyl{i}", last_name="Petrenko",
+                              email=f"v{i}@x.com"))
+
+    bump = AsyncMock()
+    monkeypatch.setattr("contacts.routes.contact_versions.bump", bump)
+
+    response = client.patch("/contacts/", headers=headers, json=[
+        {"id": 1, "email": "new@x.com"},
+        {"id": 2, "email": "v2@x.com"},
+        {"id": 3, "last_name": None, "birthday": "1990-01-02"},
+        {"id": 3, "extra": "twice"},
+        {"id": 42, "extra": "missing"},
+    ])
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()] == \
+        [200, 409, 200, 422, 404]
+    bump.assert_awaited_once_with(db_user.id)
+
+    assert client.get("/contacts/1", headers=headers).json()["email"] \
+        == "new@x.com"
+    assert client.get("/contacts/2", headers=headers).json()["email"] \
+        == "v1@x.com"
+    third = client.get("/contacts/3", headers=headers).json()
+    assert third["full_name"] == "Vasyl2"
+    assert third["birthday"] == "1990-01-02"
+
+
+def test_failed_patch_keeps_the_version(client, db_user, get_access_token,
+                                        monkeypatch):
+    bump = AsyncMock()
+    monkeypatch.setattr("contacts.routes.contact_versions.bump", bump)
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.patch("/contacts/", headers=headers, json=[
+        {"id": 2, "email": "v2@x.com"},
+        {"id": 42, "extra": "missing"},
+    ])
+    assert response.status_code == 200, response.text
+    assert [item["status"] for item in response.json()] == [409, 404]
+    bump.assert_not_awaited()
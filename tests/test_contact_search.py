@@ -0,0 +1,51 @@
+import pytest
+
+from contacts.search import search_query
+
+
+@pytest.fixture(scope='module')
+def headers(client, db_user, get_access_token):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    response = client.post("/contacts/", headers=headers, json=[
+        dict(first_name="Ivan", last_name="Petrenkovych", phone="0501112233"),
+        dict(first_name="Olena", last_name="Kovalenko", phone="0679998877"),
+        dict(first_name="Petro", last_name="Petrenko", email="pp@ukr.net"),
+    ])
+    assert response.status_code == 200, response.text
+    return headers
+
+
+def find(client, headers, **params) -> list[str]:
+    response = client.get("/contacts/find", headers=headers, params=params)
+    if response.status_code == 404:
+        return []
+    assert response.status_code == 200, response.text
+    return [contact["full_name"] for contact in response.json()]
+
+
+def test_ranked_best_match_first(client, headers):
+    # two hits in a shorter name outrank the older, longer contact
+    assert find(client, headers, value="Petr") == \
+        ["Petro Petrenko", "Ivan Petrenkovych"]
+    assert find(client, headers, value="etr", limit=1, offset=1) == \
+        ["Ivan Petrenkovych"]
+    assert find(client, headers, value="ukr.n", field="email") == \
+        ["Petro Petrenko"]
+
+
+def test_like_fallback_without_fts(client, headers, monkeypatch):
+    for dialect in ("mysql", "mssql"):
+        sql = str(search_query(dialect, 1, "full_name", "Petr"))
+        assert "contacts_fts" not in sql and "LIKE" in sql.upper()
+
+    # values below a trigram and unindexed fields always go through LIKE
+    assert find(client, headers, value="en") == \
+        ["Ivan Petrenkovych", "Olena Kovalenko", "Petro Petrenko"]
+    assert find(client, headers, value="Ol", field="first_name") == \
+        ["Olena Kovalenko"]
+
+    # without FTS the same search finds the same contacts, in id order
+    monkeypatch.setattr("contacts.search.FTS_MIN_LENGTH", 100)
+    assert find(client, headers, value="Petr") == \
+        ["Ivan Petrenkovych", "Petro Petrenko"]
+    assert find(client, headers, value="50%") == []
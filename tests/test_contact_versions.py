@@ -0,0 +1,64 @@
+import unittest
+
+from fakeredis import FakeAsyncRedis
+from starlette.requests import Request
+
+from src.contacts.versions import (ContactVersions, make_etag,
+                                   not_modified, request_digest)
+
+
+def make_request(path: str, query: str = "", if_none_match: str = None):
+    headers = [(b"if-none-match", if_none_match.encode())] \
+        if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path,
+                    "query_string": query.encode(), "headers": headers})
+
+
+class TestContactVersions(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.versions = ContactVersions()
+        self.versions.redis = FakeAsyncRedis()
+
+    async def etag(self, owner, request):
+        version = await self.versions.get(owner)
+        return make_etag(version, request_digest(owner, request))
+
+    async def test_etag_changes_on_bump_only_for_owner(self):
+        request = make_request("/contacts/", "limit=10&after=5")
+        etag = await self.etag(1, request)
+        other = await self.etag(2, request)
+        self.assertEqual(etag, await self.etag(1, request))
+        await self.versions.bump(2)
+        self.assertEqual(etag, await self.etag(1, request))
+        self.assertNotEqual(other, await self.etag(2, request))
+
+    async def test_etag_per_representation(self):
+        etag = await self.etag(1, make_request("/contacts/",
+                                               "limit=1&after=2"))
+        self.assertEqual(etag, await self.etag(
+            1, make_request("/contacts/", "after=2&limit=1")))
+        self.assertNotEqual(etag, await self.etag(
+            1, make_request("/contacts/1")))
+
+    async def test_lost_counter_does_not_reuse_tags(self):
+        request = make_request("/contacts/")
+        etag = await self.etag(1, request)
+        await self.versions.redis.flushall()
+        await self.versions.bump(1)
+        self.assertNotEqual(etag, await self.etag(1, request))
+
+    async def test_no_redis_no_version(self):
+        self.versions.redis = None
+        request = make_request("/contacts/", if_none_match="*")
+        self.assertIsNone(await self.versions.get(1))
+        self.assertFalse(not_modified(request, None))
+
+    def test_not_modified(self):
+        etag = '"1-abc"'
+        self.assertTrue(not_modified(make_request("/", if_none_match=etag),
+                                     etag))
+        self.assertTrue(not_modified(
+            make_request("/", if_none_match='"0-x", W/"1-abc"'), etag))
+        self.assertFalse(not_modified(
+            make_request("/", if_none_match='"0-abc"'), etag))
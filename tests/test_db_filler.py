@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, text
+
+import db_filler
+
+
+class TestDBFiller(unittest.TestCase):
+
+    def args(self, *argv: str):
+        return db_filler.parse_args(["--users", "5", "--contacts", "250",
+                                     "--chunk", "100", *argv])
+
+    def test_chunks_are_deterministic(self):
+        config = db_filler.FillConfig(self.args("--owner-skew", "0"))
+        self.assertEqual(db_filler.generate_chunk(config, 1),
+                         db_filler.generate_chunk(config, 1))
+        self.assertNotEqual(db_filler.generate_chunk(config, 0),
+                            db_filler.generate_chunk(config, 1))
+        self.assertEqual([row[0] for row in
+                          db_filler.generate_chunk(config, 2)],
+                         list(range(201, 251)))
+
+    def test_skew_and_nulls(self):
+        config = db_filler.FillConfig(self.args(
+            "--contacts", "2000", "--chunk", "2000", "--owner-skew", "2",
+            "--null-email", "1", "--birthday-window", "12-30",
+            "--birthday-skew", "1"))
+        rows = db_filler.generate_chunk(config, 0)
+        owners = [row[-1] for row in rows]
+        self.assertGreater(owners.count(1), owners.count(5) * 10)
+        self.assertTrue(all(row[4] is None for row in rows))
+        self.assertTrue(all(row[6] in (1230, 1231, 101, 102, 103, 104, 105)
+                            for row in rows if row[6] is not None))
+
+    def test_leap_day_window(self):
+        config = db_filler.FillConfig(self.args(
+            "--contacts", "500", "--chunk", "500", "--null-birthday", "0",
+            "--birthday-window", "02-29", "--birthday-skew", "1"))
+        birthdays = [row[5] for row in db_filler.generate_chunk(config, 0)]
+        self.assertTrue(all((day.month, day.day) <= (3, 6)
+                            and (day.month, day.day) >= (2, 29)
+                            for day in birthdays))
+        self.assertIn((2, 29), {(day.month, day.day) for day in birthdays})
+        with self.assertRaises(SystemExit), \
+                contextlib.redirect_stderr(io.StringIO()):
+            self.args("--birthday-window", "02-30")
+
+    def test_fill_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = "sqlite:///" + os.path.join(tmp, "fill.sqlite")
+            report = db_filler.main(self.args("--url", url, "--reset",
+                                              "--workers", "2"))
+            self.assertEqual(report["contacts"], 250)
+            engine = create_engine(url)
+            with engine.connect() as conn:
+                self.assertEqual(conn.execute(text(
+                    "SELECT count(*), count(DISTINCT full_name), max(id) "
+                    "FROM contacts")).one(), (250, 250, 250))
+                self.assertEqual(conn.scalar(text(
+                    "SELECT count(*) FROM users")), 5)
+            engine.dispose()
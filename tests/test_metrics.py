@@ -0,0 +1,73 @@
+import unittest
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from auth.cache import claims_cache
+from monitoring.metrics import (Histogram, http_in_progress, registry,
+                                request_calls)
+from ratelimit.limiter import limiter
+from monitoring.middleware import MetricsMiddleware
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics-test/{item_id}")
+async def read_item(item_id: int):
+    request_calls.get().queries += 2
+    return {"id": item_id}
+
+
+@app.get("/metrics-test-limited")
+async def limited():
+    raise HTTPException(status_code=429, detail="Too Many Requests")
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_render(self):
+        histogram = Histogram("latency", "Latency.", ("route",), (0.1, 1))
+        histogram.observe("/a", value=0.05)
+        histogram.observe("/a", value=0.1)
+        histogram.observe("/a", value=3)
+        self.assertEqual(list(histogram.render()), [
+            "# HELP latency Latency.",
+            "# TYPE latency histogram",
+            'latency_bucket{route="/a",le="0.1"} 2',
+            'latency_bucket{route="/a",le="1"} 2',
+            'latency_bucket{route="/a",le="+Inf"} 3',
+            'latency_sum{route="/a"} 3.15',
+            'latency_count{route="/a"} 3'])
+
+    def test_middleware_labels_route_templates(self):
+        client = TestClient(app)
+        for item_id in range(3):
+            client.get(f"/metrics-test/{item_id}")
+        client.get("/metrics-test-limited")
+        client.get("/no-such-route")
+        text = registry.render().decode()
+        self.assertIn('http_requests_total{method="GET",'
+                      'route="/metrics-test/{item_id}",status="200"} 3',
+                      text)
+        self.assertIn('http_request_db_queries_sum'
+                      '{route="/metrics-test/{item_id}"} 6', text)
+        self.assertIn('http_rate_limited_total'
+                      '{route="/metrics-test-limited"} 1', text)
+        self.assertIn('route="unmatched",status="404"', text)
+        self.assertNotIn("/metrics-test/1", text)
+        self.assertEqual(http_in_progress.values[("GET",)], 0)
+
+    def test_cache_and_limiter_stats(self):
+        claims_cache.get("not cached", "access_token")
+        text = registry.render().decode()
+        self.assertIn('cache_requests_total{cache="claims",result="miss"} '
+                      f'{claims_cache.stats()["misses"]}', text)
+        self.assertIn('cache_requests_total{cache="user",result="redis_hit"}',
+                      text)
+        self.assertIn('cache_requests_total{cache="contacts",'
+                      'result="waited_hit"}', text)
+        self.assertIn(f'rate_limiter_rejected_total '
+                      f'{limiter.stats()["rejected"]}', text)
+        self.assertIn(f'rate_limiter_buckets {len(limiter.buckets)}', text)
+        self.assertIn('rate_limiter_syncs_total{result="error"}', text)
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# db.py resolves monitoring from src/, the checkout waits go to that module
+from monitoring.pool import InstrumentedPool, PoolStats, pool_stats
+from settings import settings
+from src.main import app
+
+
+class TestPoolStats(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite:///" + os.path.join(self.tmp.name, "pool.db"),
+            poolclass=InstrumentedPool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05)
+        self.stats = PoolStats()
+        self.stats.attach(self.engine)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        self.tmp.cleanup()
+
+    async def test_checkout_counters(self):
+        waits = pool_stats.waits
+        async with self.engine.connect() as conn:
+            await conn.execute(text("select 1"))
+            snapshot = self.stats.snapshot()
+            self.assertEqual(snapshot["checked_out"], 1)
+            self.assertEqual(snapshot["pool_size"], 1)
+        async with self.engine.connect() as conn:
+            await conn.execute(text("select 1"))
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot["connects"], 1)
+        self.assertEqual(snapshot["checkouts"], 2)
+        self.assertEqual(snapshot["checkins"], 2)
+        self.assertEqual(snapshot["checked_out"], 0)
+        self.assertEqual(pool_stats.waits, waits + 2)
+
+    async def test_timeout_counted(self):
+        timeouts = pool_stats.timeouts
+        async with self.engine.connect():
+            with self.assertRaises(exc.TimeoutError):
+                async with self.engine.connect():
+                    pass
+        self.assertEqual(pool_stats.timeouts, timeouts + 1)
+        self.assertGreaterEqual(pool_stats.wait_max, 0.05)
+
+
+class TestPoolEndpoint(unittest.TestCase):
+
+    def test_internal_hosts_only(self):
+        client = TestClient(app)
+        self.assertEqual(client.get("/internal/pool").status_code, 404)
+        hosts = settings.internal_hosts
+        settings.internal_hosts = ["testclient"]
+        try:
+            response = client.get("/internal/pool")
+        finally:
+            settings.internal_hosts = hosts
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("checkouts", response.json())
+        self.assertIn("wait_max_ms", response.json())
+
+    def test_proxied_requests_need_the_token(self):
+        client = TestClient(app)
+        hosts = settings.internal_hosts
+        settings.internal_hosts = ["testclient"]
+        try:
+            # a reverse proxy on an internal host forwards everyone
+            self.assertEqual(client.get(
+                "/metrics",
+                headers={"X-Forwarded-For": "203.0.113.7"}).status_code, 404)
+            # a trusted proxy is believed about who it forwards
+            settings.trusted_proxies = ["testclient"]
+            self.assertEqual(client.get(
+                "/metrics",
+                headers={"X-Forwarded-For": "203.0.113.7"}).status_code, 404)
+            settings.internal_hosts = ["127.0.0.1"]
+            self.assertEqual(client.get(
+                "/metrics",
+                headers={"X-Forwarded-For": "127.0.0.1"}).status_code, 200)
+            settings.trusted_proxies = []
+            settings.internal_token = "s3cret"
+            self.assertEqual(client.get("/metrics").status_code, 404)
+            self.assertEqual(client.get(
+                "/metrics",
+                headers={"Authorization": "Bearer wrong"}).status_code, 404)
+            self.assertEqual(client.get(
+                "/metrics",
+                headers={"Authorization": "Bearer s3cret",
+                         "X-Forwarded-For": "203.0.113.7"}).status_code, 200)
+        finally:
+            settings.internal_hosts = hosts
+            settings.internal_token = ""
+            settings.trusted_proxies = []
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from monitoring.metrics import RequestCalls, request_calls
+from monitoring.queries import QueryBudgetExceeded, instrument_engine
+from settings import settings
+
+# statements each endpoint may run once UserCache holds the access user
+ENDPOINTS = [
+    ("post", "/contacts/", 1,
+     dict(json=dict(first_name="Taras", last_name="Shevchenko"))),
+    ("post", "/contacts/", 1,
+     dict(json=[dict(first_name=f"Bulk{i}") for i in range(5)])),
+    ("patch", "/contacts/", 4,
+     dict(json=[dict(id=1, phone="1234567"), dict(id=2, phone="7654321"),
+                dict(id=99, email="x@x.com")])),
+    ("get", "/contacts/", 1, {}),
+    ("get", "/contacts/?after=1&limit=2", 1, {}),
+    ("get", "/contacts/1", 1, {}),
+    ("get", "/contacts/find?value=Bulk", 1, {}),
+    ("get", "/contacts/bd_mates", 1, {}),
+    ("get", "/contacts/bd_mates/365", 1, {}),
+    ("put", "/contacts/1/add/email/t@s.ua", 1, {}),
+    ("patch", "/contacts/1/edit/phone/1112223", 1, {}),
+    ("delete", "/contacts/1/delete/phone", 1, {}),
+    ("delete", "/contacts/delete/2", 2, {}),
+    ("post", "/contacts/import?format=ndjson", 1,
+     dict(content=b'{"first_name": "Ivan"}\n' * 3)),
+    ("get", "/contacts/export?format=ndjson", 1, {}),
+    ("get", "/users/profile/", 1, {}),
+]
+
+
+def test_endpoint_query_counts(client, db_user, get_access_token, queries):
+    headers = {'Authorization': f'Bearer {get_access_token}'}
+    counts = []
+    for method, url, expected, kwargs in ENDPOINTS:
+        client.get("/users/profile/", headers=headers)
+        queries.clear()
+        response = getattr(client, method)(url, headers=headers, **kwargs)
+        assert response.status_code < 500, (url, response.text)
+        counts.append((method, url, len(queries)))
+    assert counts == [(method, url, expected)
+                      for method, url, expected, _ in ENDPOINTS]
+
+
+@pytest.fixture()
+def budget_engine(monkeypatch):
+    monkeypatch.setattr(settings, "query_budget", 2)
+    monkeypatch.setattr(settings, "query_budget_mode", "fail")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+def test_budget_fails_and_tags(budget_engine):
+    executed = []
+
+    @event.listens_for(budget_engine.sync_engine, "after_cursor_execute")
+    def capture(conn, cursor, statement, *_):
+        executed.append(statement)
+
+    async def run(statements: int) -> RequestCalls:
+        calls = RequestCalls({"route": None})
+        token = request_calls.set(calls)
+        try:
+            async with budget_engine.connect() as conn:
+                for _ in range(statements):
+                    await conn.execute(text("select 1"))
+        finally:
+            request_calls.reset(token)
+        return calls
+
+    calls = asyncio.run(run(2))
+    assert calls.queries == 2 and calls.query_time > 0
+    assert executed[0] == "select 1 /*route='unmatched'*/"
+    with pytest.raises(QueryBudgetExceeded):
+        asyncio.run(run(3))
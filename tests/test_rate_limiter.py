@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+
+from fakeredis import FakeAsyncRedis, FakeServer
+from starlette.requests import Request
+
+from ratelimit.limiter import (HybridLimiter, Limit, client_id,
+                               parse_limit, route_limit)
+from settings import settings
+
+
+class TestLimits(unittest.TestCase):
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit("2/10s"), Limit(2, 10))
+        self.assertEqual(parse_limit("1/2m"), Limit(1, 120))
+        self.assertEqual(parse_limit("100/h"), Limit(100, 3600))
+        self.assertEqual(parse_limit("5/500ms"), Limit(5, 0.5))
+        with self.assertRaises(ValueError):
+            parse_limit("2 per second")
+
+    def test_route_limit(self):
+        route_limit.cache_clear()
+        limits = {"/users/avatar": "1/2m", "POST /contacts/": "5/s"}
+        with patch.object(settings, "rate_limits", limits), \
+                patch.object(settings, "rate_limit", "2/10s"):
+            self.assertEqual(route_limit("DELETE", "/users/avatar"),
+                             Limit(1, 120))
+            self.assertEqual(route_limit("POST", "/contacts/"), Limit(5, 1))
+            self.assertEqual(route_limit("GET", "/contacts/"), Limit(2, 10))
+        route_limit.cache_clear()
+
+    def test_client_id(self):
+        def request(peer: str, forwarded: str) -> Request:
+            return Request({"type": "http", "client": (peer, 40000),
+                            "headers": [(b"x-forwarded-for",
+                                         forwarded.encode())]})
+
+        # any client can send the header, only trusted proxies are believed
+        self.assertEqual(client_id(request("203.0.113.7", "10.0.0.1")),
+                         "203.0.113.7")
+        with patch.object(settings, "trusted_proxies",
+                          ["127.0.0.1", "10.0.0.2"]):
+            self.assertEqual(client_id(request("203.0.113.7", "10.0.0.1")),
+                             "203.0.113.7")
+            # the hop the first trusted proxy saw, not the spoofed ones
+            self.assertEqual(client_id(request(
+                "127.0.0.1", "1.1.1.1, 198.51.100.4, 10.0.0.2")),
+                "198.51.100.4")
+            self.assertEqual(client_id(request("127.0.0.1", "")),
+                             "127.0.0.1")
+        self.assertEqual(client_id(Request({"type": "http", "client": None,
+                                            "headers": []})), "unknown")
+
+
+class TestHybridLimiter(unittest.IsolatedAsyncioTestCase):
+    limit = Limit(3, 3600)
+
+    def make_limiter(self, redis=None, fail="open") -> HybridLimiter:
+        limiter = HybridLimiter(sync_interval=3600, fail=fail, size=2)
+        limiter.redis = redis
+        return limiter
+
+    async def test_local_bucket(self):
+        limiter = self.make_limiter()
+        self.assertEqual([limiter.hit("a", self.limit) for _ in range(3)],
+                         [0, 0, 0])
+        self.assertAlmostEqual(limiter.hit("a", self.limit), 1200, places=1)
+        self.assertEqual(limiter.hit("b", self.limit), 0)
+        limiter.buckets["a"].updated -= 1200
+        self.assertEqual(limiter.hit("a", self.limit), 0)
+
+    async def test_lru_eviction(self):
+        limiter = self.make_limiter()
+        for key in ("a", "b", "c"):
+            limiter.hit(key, self.limit)
+        self.assertEqual(list(limiter.buckets), ["b", "c"])
+
+    async def test_sync_shares_hits_between_workers(self):
+        redis = FakeAsyncRedis()
+        first = self.make_limiter(redis)
+        second = self.make_limiter(redis)
+
+        self.assertEqual(first.hit("a", self.limit), 0)
+        self.assertEqual(first.hit("a", self.limit), 0)
+        await first.sync()
+        self.assertEqual(second.hit("a", self.limit), 0)
+        await second.sync()
+
+        # the second worker learnt about the first one's two hits
+        self.assertGreater(second.hit("a", self.limit), 0)
+        # the first admits from its own view until its next sync
+        self.assertEqual(first.hit("a", self.limit), 0)
+        await first.sync()
+        self.assertGreater(first.hit("a", self.limit), 0)
+        self.assertEqual(first.buckets["a"].pending, 0)
+        self.assertEqual(await redis.get(next(iter(await redis.keys()))),
+                         b"4")
+
+    async def test_fail_open_and_closed(self):
+        for fail, admitted in (("open", True), ("closed", False)):
+            server = FakeServer()
+            limiter = self.make_limiter(FakeAsyncRedis(server=server), fail)
+            limiter.hit("a", self.limit)
+            server.connected = False
+            await limiter.sync()
+            self.assertIs(limiter.available, False)
+            self.assertEqual(limiter.hit("a", self.limit) == 0, admitted)
+
+            server.connected = True
+            await limiter.sync()
+            self.assertIs(limiter.available, True)
+            self.assertEqual(limiter.hit("a", self.limit), 0)
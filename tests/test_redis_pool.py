@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+
+from fakeredis import FakeAsyncRedis, FakeServer
+from fakeredis.aioredis import FakeConnection
+from fastapi.testclient import TestClient
+
+from main import app
+import redis_pool
+from redis_pool import (TrackingConnectionPool, close_redis, delete_many,
+                        get_many, get_redis, pipelined, pool_snapshot,
+                        set_many)
+from settings import settings
+
+
+class TestBatchHelpers(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.redis = FakeAsyncRedis()
+
+    async def test_set_get_delete_many(self):
+        await set_many(self.redis, {"a": "1", "b": b"2"}, ex=60)
+        self.assertEqual(await get_many(self.redis, ["a", "missing", "b"]),
+                         [b"1", None, b"2"])
+        self.assertLessEqual(await self.redis.ttl("a"), 60)
+        self.assertEqual(await delete_many(self.redis, ["a", "b", "c"]), 2)
+        self.assertEqual(await get_many(self.redis, []), [])
+        self.assertEqual(await delete_many(self.redis, []), 0)
+
+    async def test_pipelined(self):
+        replies = await pipelined(self.redis, (
+            ("set", ("n", 1), {"nx": True}),
+            ("incrby", ("n", 2), {}),
+            ("get", ("n",), {})))
+        self.assertEqual(replies, [True, 3, b"3"])
+
+
+class TestClosePool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.pool = TrackingConnectionPool(connection_class=FakeConnection,
+                                           server=FakeServer(),
+                                           max_connections=2)
+        self.patches = [(name, getattr(redis_pool, name))
+                        for name in ("pool", "redis")]
+        redis_pool.pool = self.pool
+        redis_pool.redis = redis_pool.Redis(connection_pool=self.pool)
+
+    def tearDown(self):
+        for name, value in self.patches:
+            setattr(redis_pool, name, value)
+
+    async def test_waits_for_connections_in_use(self):
+        idle = await self.pool.get_connection()
+        connection = await self.pool.get_connection()
+        await self.pool.release(idle)
+        self.assertEqual(pool_snapshot(),
+                         {"max_connections": 2, "in_use": 1, "idle": 1})
+
+        async def release():
+            await asyncio.sleep(0.05)
+            await self.pool.release(connection)
+
+        started = time.monotonic()
+        await asyncio.gather(close_redis(timeout=5), release())
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(pool_snapshot()["in_use"], 0)
+
+    async def test_gives_up_after_the_timeout(self):
+        await self.pool.get_connection()
+        started = time.monotonic()
+        await close_redis(timeout=0.05)
+        self.assertLess(time.monotonic() - started, 1)
+
+
+class TestRedisEndpoint(unittest.TestCase):
+
+    def test_internal_redis_uses_the_dependency(self):
+        async def fake_redis():
+            yield FakeAsyncRedis()
+
+        app.dependency_overrides[get_redis] = fake_redis
+        hosts = settings.internal_hosts
+        settings.internal_hosts = ["testclient"]
+        try:
+            response = TestClient(app).get("/internal/redis")
+        finally:
+            settings.internal_hosts = hosts
+            del app.dependency_overrides[get_redis]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["max_connections"],
+                         settings.redis_pool_size)
+        self.assertIn("ping_ms", response.json())
@@ -0,0 +1,79 @@
+import unittest
+from datetime import timedelta
+
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import RedisError
+
+from src.auth.sessions import SessionStore
+
+
+class TestSessionStore(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.store = SessionStore()
+        self.store.redis = FakeAsyncRedis()
+
+    async def test_create_and_revoke(self):
+        laptop = await self.store.create("a@b.com", timedelta(minutes=5))
+        phone = await self.store.create("a@b.com", timedelta(minutes=5))
+        self.assertNotEqual(laptop, phone)
+        self.assertLessEqual(await self.store.redis.ttl("session:" + laptop),
+                             300)
+
+        await self.store.revoke(laptop, "a@b.com")
+        self.assertIs(await self.store.active(laptop), False)
+        self.assertIs(await self.store.active(phone), True)
+
+    async def test_revoke_all(self):
+        for _ in range(3):
+            await self.store.create("a@b.com", timedelta(minutes=5))
+        other = await self.store.create("c@d.com", timedelta(minutes=5))
+
+        self.assertEqual(await self.store.revoke_all("a@b.com"), 3)
+        self.assertEqual(await self.store.revoke_all("a@b.com"), 0)
+        self.assertIs(await self.store.active(other), True)
+
+    async def test_not_initialised(self):
+        self.store.redis = None
+        with self.assertRaises(RedisError):
+            await self.store.active("session")
+
+
+def test_sessions_without_db_writes(client, db_user, user, session_store,
+                                    queries):
+    def bearer(token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    credentials = {"email": user["email"], "password": user["hashed_pwd"]}
+    laptop = client.post("/auth/login", json=credentials).json()
+    phone = client.post("/auth/login", json=credentials).json()
+    for device in (laptop, phone):
+        response = client.get("/users/profile/",
+                              headers=bearer(device["access_token"]))
+        assert response.status_code == 200, response.text
+
+    response = client.post("/auth/logout",
+                           headers=bearer(laptop["access_token"]))
+    assert response.status_code == 200, response.text
+    assert client.get("/users/profile/",
+                      headers=bearer(laptop["access_token"])) \
+        .status_code == 401
+    assert client.post("/auth/refresh",
+                       headers=bearer(laptop["refresh_token"])) \
+        .status_code == 401
+
+    refreshed = client.post("/auth/refresh",
+                            headers=bearer(phone["refresh_token"]))
+    assert refreshed.status_code == 200, refreshed.text
+    access_token = refreshed.json()["access_token"]
+    assert client.get("/users/profile/",
+                      headers=bearer(access_token)).status_code == 200
+
+    response = client.post("/auth/logout/all",
+                           headers=bearer(access_token))
+    assert response.json() == {"details": "User logged out of 1 sessions"}
+    for token in (access_token, phone["access_token"]):
+        assert client.get("/users/profile/",
+                          headers=bearer(token)).status_code == 401
+
+    assert [q for q in queries if not q.lstrip().startswith("SELECT")] == []
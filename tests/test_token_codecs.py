@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from ecdsa import NIST256p, SigningKey
+
+from src.auth.tokens import (HMACCodec, InvalidToken, JoseCodec,
+                             PyJWTCodec, TokenCodec, make_codec)
+
+CLAIMS = {"sub": "some@email.com",
+          "exp": int(time.time()) + 60,
+          "scope": "access_token"}
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS512"])
+def test_hmac_and_jose_interoperate(algorithm):
+    hmac_codec = HMACCodec(algorithm, "secret")
+    jose_codec = JoseCodec(algorithm, "secret", "secret")
+
+    assert jose_codec.decode(hmac_codec.encode(CLAIMS)) == CLAIMS
+    assert hmac_codec.decode(jose_codec.encode(CLAIMS)) == CLAIMS
+
+
+@pytest.mark.parametrize("codec", [HMACCodec("HS256", "secret"),
+                                   JoseCodec("HS256", "secret", "secret")],
+                         ids=["hmac", "jose"])
+def test_rejects_forged_tokens(codec):
+    token = codec.encode(CLAIMS)
+    other_key = HMACCodec("HS256", "other").encode(CLAIMS)
+    other_alg = HMACCodec("HS512", "secret").encode(CLAIMS)
+
+    for forged in (token[:-2] + ("AA" if token[-2:] != "AA" else "BB"),
+                   other_key, other_alg, "not.a.token", ""):
+        with pytest.raises(InvalidToken):
+            codec.decode(forged)
+
+
+def ed25519_pems() -> tuple[str, str]:
+    key = Ed25519PrivateKey.generate()
+    private = key.private_bytes(serialization.Encoding.PEM,
+                                serialization.PrivateFormat.PKCS8,
+                                serialization.NoEncryption())
+    public = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo)
+    return private.decode(), public.decode()
+
+
+def test_pyjwt_eddsa(tmp_path):
+    private_pem, public_pem = ed25519_pems()
+    private_key = tmp_path / "private.pem"
+    public_key = tmp_path / "public.pem"
+    private_key.write_text(private_pem)
+    public_key.write_text(public_pem)
+
+    signer = make_codec("EdDSA", private_key=private_key)
+    verifier = make_codec("EdDSA", public_key=public_key)
+    assert signer.backend == verifier.backend == "pyjwt"
+    token = signer.encode(CLAIMS)
+
+    assert verifier.decode(token) == CLAIMS
+    assert signer.decode(token) == CLAIMS
+    with pytest.raises(InvalidToken):
+        verifier.encode(CLAIMS)
+
+    other_key = PyJWTCodec("EdDSA", ed25519_pems()[0], None).encode(CLAIMS)
+    other_alg = HMACCodec("HS256", "secret").encode(CLAIMS)
+    # the last characters of a signature may only hold padding bits
+    tampered = token[:-10] + ("A" if token[-10] != "A" else "B") + token[-9:]
+    for forged in (tampered, other_key, other_alg, "not.a.token", ""):
+        with pytest.raises(InvalidToken):
+            verifier.decode(forged)
+
+
+def test_codec_is_abstract():
+    with pytest.raises(TypeError):
+        TokenCodec("HS256")
+
+
+def test_make_codec_backends(tmp_path):
+    assert make_codec("HS256", secret="secret").backend == "hmac"
+    assert make_codec("HS256", secret="secret",
+                      backend="jose").backend == "jose"
+    with pytest.raises(ValueError):
+        make_codec("HS256")
+    with pytest.raises(ValueError):
+        make_codec("ES256", backend="jose")
+
+
+def test_jose_es256_verify_only(tmp_path):
+    signing_key = SigningKey.generate(curve=NIST256p)
+    private_key = tmp_path / "private.pem"
+    public_key = tmp_path / "public.pem"
+    private_key.write_bytes(signing_key.to_pem())
+    public_key.write_bytes(signing_key.get_verifying_key().to_pem())
+
+    signer = make_codec("ES256", private_key=private_key, backend="jose")
+    verifier = make_codec("ES256", public_key=public_key, backend="jose")
+    token = signer.encode(CLAIMS)
+
+    assert verifier.decode(token) == CLAIMS
+    assert signer.decode(token) == CLAIMS
+    with pytest.raises(InvalidToken):
+        verifier.encode(CLAIMS)
+    with pytest.raises(InvalidToken):
+        verifier.decode(HMACCodec("HS256", "secret").encode(CLAIMS))
@@ -0,0 +1,97 @@
+import json
+import time
+import unittest
+
+from fakeredis import FakeAsyncRedis
+
+from src.auth.cache import ClaimsCache, UserCache
+from src.users.models import UserAuth
+
+
+def make_user(email: str) -> UserAuth:
+    return UserAuth(id=1,
+                    email=email,
+                    email_confirmed=True)
+
+
+class TestUserCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = UserCache(size=2, local_ttl=60, ttl=60)
+        self.cache.redis = FakeAsyncRedis()
+
+    async def test_miss_then_hit(self):
+        self.assertIsNone(await self.cache.get("djedai@tatuin.emp"))
+        await self.cache.set(make_user("djedai@tatuin.emp"))
+        user = await self.cache.get("djedai@tatuin.emp")
+        self.assertEqual(user.email, "djedai@tatuin.emp")
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    async def test_redis_shared_between_workers(self):
+        await self.cache.set(make_user("djedai@tatuin.emp"))
+        other = UserCache(size=2, local_ttl=60, ttl=60)
+        other.redis = self.cache.redis
+        user = await other.get("djedai@tatuin.emp")
+        self.assertIs(user.email_confirmed, True)
+        self.assertEqual(other.stats()["redis_hits"], 1)
+        self.assertEqual(
+            set(json.loads(await self.cache.redis.get(
+                "user:djedai@tatuin.emp"))),
+            {"id", "email", "email_confirmed"})
+
+    async def test_invalidate(self):
+        await self.cache.set(make_user("djedai@tatuin.emp"))
+        await self.cache.invalidate("djedai@tatuin.emp")
+        self.assertIsNone(await self.cache.get("djedai@tatuin.emp"))
+        self.assertEqual(await self.cache.redis.exists("user:djedai@tatuin.emp"),
+                         0)
+
+    async def test_lru_eviction(self):
+        self.cache.redis = None
+        for email in ("a@b.com", "c@d.com", "e@f.com"):
+            await self.cache.set(make_user(email))
+        self.assertIsNone(await self.cache.get("a@b.com"))
+        self.assertIsNotNone(await self.cache.get("e@f.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class TestClaimsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ClaimsCache(size=2)
+        self.claims = {"sub": "djedai@tatuin.emp",
+                       "scope": "access_token",
+                       "exp": int(time.time()) + 60}
+
+    def test_hit_per_token_and_scope(self):
+        self.assertIsNone(self.cache.get("token", "access_token"))
+        self.cache.set("token", "access_token", self.claims)
+        self.assertEqual(self.cache.get("token", "access_token"),
+                         self.claims)
+        self.assertIsNone(self.cache.get("token", "refresh_token"))
+        self.assertEqual(self.cache.stats(),
+                         {"hits": 1, "misses": 2, "size": 1})
+
+    def test_expires_at_exp(self):
+        self.cache.set("expired", "access_token",
+                       {**self.claims, "exp": int(time.time()) - 1})
+        self.cache.set("no exp", "access_token", {"sub": "x"})
+        self.assertEqual(self.cache.stats()["size"], 0)
+        self.cache.set("token", "access_token", self.claims)
+        self.cache.local[self.cache.key("token", "access_token")] = \
+            (time.time() - 1, self.claims)
+        self.assertIsNone(self.cache.get("token", "access_token"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_bounded_and_disabled(self):
+        for token in ("a", "b", "c"):
+            self.cache.set(token, "access_token", self.claims)
+        self.assertIsNone(self.cache.get("a", "access_token"))
+        self.assertIsNotNone(self.cache.get("c", "access_token"))
+        disabled = ClaimsCache(size=0)
+        disabled.set("a", "access_token", self.claims)
+        self.assertIsNone(disabled.get("a", "access_token"))